@@ -1,14 +1,35 @@
-from typing import List, Optional
-from pathlib import Path
+from typing import List, Optional, Tuple
 import astrbot.core.message.components as Comp
 from astrbot.api.event import filter, AstrMessageEvent
 from astrbot.api.star import Context, Star, register, StarTools
-from astrbot.api import logger
-from .script.get_server_info import get_server_status
-from .script.get_img import generate_server_info_image
-from .script.json_operate import read_json, add_data, del_data
+from astrbot.api import logger, AstrBotConfig
+from .script.get_server_info import get_server_status, configure_status_client
+from .script.slp import slp_client
+from .script.player_providers import player_list_client, validate_provider
+from .script.metrics import metrics
+from .script.text_measure import text_measurer
+from .script.status_cache import status_cache
+from .script.reply_cache import reply_cache
+from .script.dns_cache import resolver_cache
+from .script.query_backoff import query_backoff
+from .script.render_pool import render_pool
+from .script.render_cache import render_cache
+from .script.image_encode import configure_encoding
+from .script.image_store import image_store
+from .script.history import history_store
+from .script.circuit_breaker import circuit_breaker, describe_offline, ERROR_LABELS
+from .script.get_img import (
+    generate_server_info_image, generate_placeholder_image, generate_dashboard_image, configure_font,
+    configure_player_overflow, generate_history_chart
+)
+from .script.registry import ServerRegistry
+from .script.sqlite_registry import SQLiteRegistry
+from .script.poller import BackgroundPoller, format_age
+from .script.server_list import HOST_PATTERN, parse_server_list, dump_server_list
 import asyncio
+import base64
 import re
+import time
 
 # 常量定义
 HELP_INFO = """
@@ -25,8 +46,29 @@ HELP_INFO = """
 /mcget 服务器名称
 --获取指定服务器的地址信息
 
+/mcmap 服务器名称 [类型 地址]
+--设置从网页地图获取完整玩家列表(适用于关闭了query的服务器)
+--类型: dynmap、bluemap、squaremap、json；设为 off 取消
+--不带类型时显示当前设置
+
 /mcdel 服务器名称
 --删除服务器
+
+/mcimport [force]
+名称 地址
+名称 地址
+--批量添加服务器(每行一个，或JSON列表)
+--所有地址并发预查询，通过的一次性保存
+
+/mcexport
+--导出本群的服务器列表(JSON，可直接用于 /mcimport)
+
+/mcstats 服务器名称 [时间范围]
+--查看在线人数和延迟的历史趋势
+--时间范围: 如 6h、24h(默认)、7d、30d
+
+/mcperf [服务器地址]
+--(管理员)查看各阶段耗时和缓存统计
 """
 
 
@@ -34,16 +76,132 @@ HELP_INFO = """
 class MyPlugin(Star):
     """Minecraft服务器信息查询插件"""
 
-    def __init__(self, context: Context):
+    def __init__(self, context: Context, config: Optional[AstrBotConfig] = None):
         """
         初始化插件
 
         Args:
             context: 插件上下文
+            config: 插件配置(_conf_schema.json)
         """
         super().__init__(context)
+        self.config = config or {}
+        self.max_concurrency = max(1, int(self.config.get("max_concurrency", 8)))
+        self.server_timeout = float(self.config.get("server_timeout", 6.0))
+        self.output_mode = self.config.get("output_mode", "cards")
+        self.import_timeout = float(self.config.get("import_timeout", 15.0))
+        self.import_max_servers = max(1, int(self.config.get("import_max_servers", 100)))
+        data_dir = StarTools.get_data_dir("astrbot_mcgetter")
+        if self.config.get("storage_backend", "json") == "sqlite":
+            # 首次启用时自动迁移已有的 {group_id}.json
+            self.registry = SQLiteRegistry(data_dir)
+        else:
+            self.registry = ServerRegistry(
+                data_dir,
+                flush_delay=self.config.get("registry_flush_delay", 1.0)
+            )
+        reply_cache.configure(ttl=self.config.get("mc_reply_reuse", 10.0))
+        status_cache.configure(
+            ttl=self.config.get("status_cache_ttl", 15.0),
+            max_size=self.config.get("status_cache_size", 512)
+        )
+        resolver_cache.configure(
+            min_ttl=self.config.get("dns_cache_min_ttl", 60.0),
+            max_ttl=self.config.get("dns_cache_max_ttl", 3600.0),
+            stale_ttl=self.config.get("dns_cache_stale_ttl", 600.0)
+        )
+        query_backoff.configure(
+            base_interval=self.config.get("query_retry_base", 60.0),
+            max_interval=self.config.get("query_retry_max", 3600.0)
+        )
+        configure_status_client(self.config.get("status_client", "native"))
+        slp_client.configure(
+            timeout=self.config.get("slp_timeout", 3.0),
+            max_sockets=self.config.get("slp_max_sockets", 256)
+        )
+        player_list_client.configure(
+            ttl=self.config.get("provider_cache_ttl", 10.0),
+            timeout=self.config.get("provider_timeout", 5.0),
+            max_connections=self.config.get("provider_max_connections", 20),
+            name_filter=self.config.get("player_name_filter", "")
+        )
+        circuit_breaker.configure(
+            failure_threshold=self.config.get("breaker_failure_threshold", 2),
+            base_interval=self.config.get("breaker_base_interval", 30.0),
+            max_interval=self.config.get("breaker_max_interval", 1800.0)
+        )
+        render_cache.configure(
+            max_bytes=int(float(self.config.get("render_cache_size_mb", 32)) * 1024 * 1024),
+            latency_bucket=self.config.get("render_cache_latency_bucket", 20)
+        )
+        configure_encoding(
+            format=self.config.get("image_format", "png"),
+            quality=self.config.get("image_quality", 85),
+            compress_level=self.config.get("png_compress_level", 6),
+            optimize=self.config.get("image_optimize", False),
+            palette_colors=self.config.get("palette_colors", 256)
+        )
+        # file: 图片写入缓存目录后按路径发送；base64: 始终以base64字符串发送
+        self.image_delivery = self.config.get("image_delivery", "file")
+        image_store.configure(
+            directory=data_dir / "images" if self.image_delivery == "file" else "",
+            max_bytes=int(float(self.config.get("image_cache_dir_mb", 64)) * 1024 * 1024)
+        )
+        configure_player_overflow(
+            max_players=self.config.get("max_players_per_card", 60),
+            mode=self.config.get("player_overflow", "summary"),
+            max_pages=self.config.get("max_player_pages", 5)
+        )
+        font_path = configure_font(self.config.get("font_path", ""))
+        if font_path:
+            logger.info(f"使用字体: {font_path}")
+        else:
+            logger.warning("未找到可用的中文字体，使用PIL默认字体，中文可能无法正常显示")
+        render_pool.set_initializer(configure_font, font_path)
+        render_pool.configure(
+            mode=self.config.get("render_pool_mode", "thread"),
+            workers=self.config.get("render_workers", 0),
+            max_pending=self.config.get("render_max_pending", 64)
+        )
+        history_store.configure(
+            data_dir=data_dir / "history",
+            enabled=self.config.get("history_enabled", True),
+            minute_hours=self.config.get("history_minute_hours", 48),
+            hour_days=self.config.get("history_hour_days", 90),
+            max_hosts=self.config.get("history_max_hosts", 500),
+            save_interval=self.config.get("history_save_interval", 300)
+        )
+        self.perf_log_interval = float(self.config.get("perf_log_interval", 0))
+        self.poller: Optional[BackgroundPoller] = None
+        self.snapshot_max_age = float(self.config.get("snapshot_max_age", 600))
+        if self.config.get("poller_enabled", False):
+            self.poller = BackgroundPoller(
+                self.registry,
+                online_interval=float(self.config.get("poller_online_interval", 30)),
+                idle_interval=float(self.config.get("poller_idle_interval", 120)),
+                offline_interval=float(self.config.get("poller_offline_interval", 300)),
+                jitter=float(self.config.get("poller_jitter", 0.2)),
+                max_concurrency=self.max_concurrency
+            )
         logger.info("MyPlugin 初始化完成")
 
+    async def initialize(self):
+        """插件激活时加载历史记录并启动后台轮询(如果启用)"""
+        await history_store.start()
+        if self.poller is not None:
+            self.poller.start()
+        metrics.start_periodic_log(self.perf_log_interval, self.perf_counters)
+
+    async def terminate(self):
+        """插件被禁用或重载时停止后台轮询、写回服务器列表和历史记录并释放渲染池和连接池"""
+        await metrics.stop()
+        if self.poller is not None:
+            await self.poller.stop()
+        await self.registry.close()
+        await history_store.close()
+        await player_list_client.close()
+        render_pool.shutdown()
+
     @filter.command("mchelp")
     async def get_help(self, event: AstrMessageEvent):
         """
@@ -62,52 +220,81 @@ class MyPlugin(Star):
         """
         查询所有保存的服务器信息
 
+        同一个群同时发起的多个 /mc 共享一次查询和渲染，完成的回复在 mc_reply_reuse 秒内直接复用
+
         Args:
             event: 消息事件
 
         Returns:
             包含服务器信息图片的消息结果，如果出错则返回None
         """
-        logger.info("开始执行 mc 命令")
+        logger.debug("开始执行 mc 命令")
         try:
             group_id = event.get_group_id()
-            logger.info(f"获取到群组ID: {group_id}")
+            logger.debug(f"获取到群组ID: {group_id}")
 
-            json_path = await self.get_json_path(group_id)
-            logger.info(f"JSON文件路径: {json_path}")
+            images, text = await reply_cache.get(group_id, lambda: self.build_reply(group_id))
+            if images:
+                yield event.chain_result([await self.to_image(img) for img in images])
+            else:
+                yield event.plain_result(text)
 
-            json_data = await read_json(json_path)
-            logger.info(f"读取到的JSON数据: {json_data}")
+        except Exception as e:
+            logger.error(f"执行 mc 命令时出错: {e}")
+            yield event.plain_result("查询服务器信息时发生错误")
 
-            if not json_data:
-                logger.warning("JSON数据为空")
-                yield event.plain_result("请先使用 /mcadd 添加服务器")
-                return
+    async def build_reply(self, group_id: str) -> Tuple[List[bytes], str]:
+        """
+        查询群内所有服务器并渲染回复
 
-            message_chain: List[Comp.Image] = []
-            for name, server_info in json_data.items():
-                try:
-                    logger.info(f"正在处理服务器: {name}, 信息: {server_info}")
-                    mcinfo_img = await self.get_img(server_info['name'], server_info['host'])
-                    if mcinfo_img:
-                        message_chain.append(Comp.Image.fromBase64(mcinfo_img))
-                        logger.info(f"成功添加图片到消息链，服务器名称: {name}")
-                    else:
-                        logger.warning(f"获取服务器 {name} 的图片失败")
-                except Exception as e:
-                    logger.error(f"处理服务器 {name} 时出错: {e}")
-                    continue
+        Args:
+            group_id: 群组ID
 
-            if message_chain:
-                logger.info(f"成功生成消息链，包含 {len(message_chain)} 张图片")
-                yield event.chain_result(message_chain)
+        Returns:
+            (编码后的图片数据列表, 没有图片时的文字回复)
+        """
+        start = time.perf_counter()
+        json_data = await self.registry.get_group(group_id)
+        logger.debug(f"读取到的服务器列表: {json_data}")
+
+        if not json_data:
+            logger.warning("JSON数据为空")
+            return [], "请先使用 /mcadd 添加服务器"
+
+        # 并发查询所有服务器，gather 保证结果顺序与保存顺序一致
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        if self.output_mode == "dashboard":
+            # 汇总模式：只查询状态，所有服务器渲染为一张图片
+            entries = await asyncio.gather(*[
+                self.get_info_limited(semaphore, name, server_info)
+                for name, server_info in json_data.items()
+            ])
+            dashboard_img = await generate_dashboard_image(entries)
+            metrics.record("mc", time.perf_counter() - start)
+            logger.debug(f"成功生成汇总图片，包含 {len(entries)} 个服务器")
+            return [dashboard_img], ""
+
+        results = await asyncio.gather(*[
+            self.get_img_limited(semaphore, name, server_info)
+            for name, server_info in json_data.items()
+        ])
+
+        images: List[bytes] = []
+        for name, mcinfo_imgs in zip(json_data.keys(), results):
+            if mcinfo_imgs:
+                # 玩家过多且使用分页时，一个服务器可能对应多张图片
+                images.extend(mcinfo_imgs)
+                logger.debug(f"成功添加图片到消息链，服务器名称: {name}")
             else:
-                logger.warning("没有可用的服务器信息")
-                yield event.plain_result("没有可用的服务器信息，请检查服务器是否在线")
+                logger.warning(f"获取服务器 {name} 的图片失败")
 
-        except Exception as e:
-            logger.error(f"执行 mc 命令时出错: {e}")
-            yield event.plain_result("查询服务器信息时发生错误")
+        metrics.record("mc", time.perf_counter() - start)
+        if not images:
+            logger.warning("没有可用的服务器信息")
+            return [], "没有可用的服务器信息，请检查服务器是否在线"
+        logger.debug(f"成功生成消息链，包含 {len(images)} 张图片")
+        return images, ""
 
     @filter.command("mcadd")
     async def mcadd(self, event: AstrMessageEvent, name: str, host: str, force: bool = False):
@@ -127,7 +314,7 @@ class MyPlugin(Star):
 
         try:
             # 检查host合法性
-            if not re.match(r'^[a-zA-Z0-9.,:]+$', host):
+            if not HOST_PATTERN.match(host):
                 yield event.plain_result("服务器地址格式不正确，只能包含字母、数字和符号.,:")
                 return
             elif await get_server_status(host) is None and not force:
@@ -135,22 +322,21 @@ class MyPlugin(Star):
                 return
 
             group_id = event.get_group_id()
-            json_path = await self.get_json_path(group_id)
 
             # 检查当前地址是否已存在
             try:
-                json_data = await read_json(json_path)
-                if json_data:
-                    for existing_name, server_info in json_data.items():
-                        if server_info['host'] == host:
-                            yield event.plain_result(f"已存在相同地址的服务器 {existing_name}")
-                            return
+                existing_name = await self.registry.find_host(group_id, host)
+                if existing_name is not None:
+                    yield event.plain_result(f"已存在相同地址的服务器 {existing_name}")
+                    return
             except Exception as e:
                 logger.error(f"检查服务器地址时出错: {e}")
                 yield event.plain_result("检查服务器地址时发生错误")
                 return
 
-            if await add_data(json_path, name, host):
+            # add 会在群锁内再次检查名称和地址，并发添加不会互相覆盖
+            if await self.registry.add(group_id, name, host):
+                self._on_group_changed(group_id)
                 yield event.plain_result(f"成功添加服务器 {name}")
             else:
                 yield event.plain_result(f"无法添加 {name}，请检查是否已存在")
@@ -174,9 +360,9 @@ class MyPlugin(Star):
         logger.info(f"开始执行 mcdel 命令: {name}")
         try:
             group_id = event.get_group_id()
-            json_path = await self.get_json_path(group_id)
 
-            if await del_data(json_path, name):
+            if await self.registry.delete(group_id, name):
+                self._on_group_changed(group_id)
                 yield event.plain_result(f"成功删除服务器 {name}")
             else:
                 yield event.plain_result(f"无法删除 {name}，请检查是否存在")
@@ -185,14 +371,141 @@ class MyPlugin(Star):
             logger.error(f"执行 mcdel 命令时出错: {e}")
             yield event.plain_result("删除服务器时发生错误")
 
+    @filter.command("mcimport")
+    async def mcimport(self, event: AstrMessageEvent):
+        """
+        批量添加服务器
+
+        命令后的文本为每行一个 "名称 地址"，或 JSON 列表(/mcexport 的输出)；
+        第一个词为 force 时跳过预查询。所有地址在并发限制下同时预查询，
+        共用一个总超时，通过的条目一次性保存，最后逐条报告结果。
+
+        Args:
+            event: 消息事件
+        """
+        text = re.sub(r'^\S*mcimport', '', event.message_str.strip(), count=1).strip()
+        force = False
+        first = text.split(maxsplit=1)
+        if first and first[0].lower() in ("force", "true"):
+            force = True
+            text = first[1] if len(first) > 1 else ""
+
+        try:
+            servers = parse_server_list(text)
+        except ValueError as e:
+            yield event.plain_result(f"无法解析服务器列表: {e}")
+            return
+        if not servers:
+            yield event.plain_result("请在 /mcimport 后每行写一个 \"名称 地址\"，或粘贴 /mcexport 导出的JSON")
+            return
+        if len(servers) > self.import_max_servers:
+            yield event.plain_result(f"一次最多导入 {self.import_max_servers} 个服务器")
+            return
+
+        logger.info(f"开始执行 mcimport 命令: {len(servers)} 个服务器, force: {force}")
+        try:
+            group_id = event.get_group_id()
+            existing = await self.registry.get_group(group_id)
+            existing_hosts = {info['host']: name for name, info in existing.items()}
+
+            # 先做不需要网络的检查，只有剩下的条目才预查询
+            reasons = {}
+            names, hosts = set(), set()
+            for index, server in enumerate(servers):
+                name, host = server['name'], server['host']
+                # 与 /mcmap 相同的检查，导入文件不能绕过
+                provider_error = server.get('provider') and validate_provider(
+                    server['provider'], server.get('provider_url', ""))
+                if not name or not HOST_PATTERN.match(host):
+                    reasons[index] = "地址格式不正确"
+                elif provider_error:
+                    reasons[index] = f"玩家列表设置无效: {provider_error}"
+                elif name in existing:
+                    reasons[index] = "名称已存在"
+                elif host in existing_hosts:
+                    reasons[index] = f"地址已存在({existing_hosts[host]})"
+                elif name in names or host in hosts:
+                    reasons[index] = "与前面的条目重复"
+                else:
+                    names.add(name)
+                    hosts.add(host)
+
+            pending = [index for index in range(len(servers)) if index not in reasons]
+            if not force and pending:
+                reasons.update(await self._validate_hosts({index: servers[index]['host'] for index in pending}))
+
+            accepted = [index for index in pending if index not in reasons]
+            results = await self.registry.add_many(group_id, [servers[index] for index in accepted])
+            for index, added in zip(accepted, results):
+                if not added:
+                    reasons[index] = "名称或地址已存在"
+            if any(results):
+                self._on_group_changed(group_id)
+
+            lines = [f"导入完成: 成功 {sum(results)} 个，失败 {len(servers) - sum(results)} 个"]
+            for index, server in enumerate(servers):
+                reason = reasons.get(index)
+                lines.append(f"{server['name']} ({server['host']}): {reason or '已添加'}")
+            yield event.plain_result("\n".join(lines))
+
+        except Exception as e:
+            logger.error(f"执行 mcimport 命令时出错: {e}")
+            yield event.plain_result("批量添加服务器时发生错误")
+
+    async def _validate_hosts(self, hosts: dict) -> dict:
+        """
+        在并发限制下同时预查询多个地址，所有查询共用 import_timeout 总超时
+
+        Args:
+            hosts: {序号: 地址}
+
+        Returns:
+            {序号: 失败原因}，只包含未通过的地址
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def check(host: str) -> bool:
+            async with semaphore:
+                return await get_server_status(host) is not None
+
+        tasks = {index: asyncio.ensure_future(check(host)) for index, host in hosts.items()}
+        _, timed_out = await asyncio.wait(tasks.values(), timeout=self.import_timeout)
+        for task in timed_out:
+            task.cancel()
+
+        reasons = {}
+        for index, task in tasks.items():
+            if task in timed_out:
+                reasons[index] = "预查询超时"
+            elif task.exception() is not None or not task.result():
+                reasons[index] = "预查询失败"
+        return reasons
+
+    @filter.command("mcexport")
+    async def mcexport(self, event: AstrMessageEvent):
+        """
+        导出本群的服务器列表，输出的JSON可以直接用于 /mcimport
+
+        Args:
+            event: 消息事件
+        """
+        try:
+            json_data = await self.registry.get_group(event.get_group_id())
+            if not json_data:
+                yield event.plain_result("没有可用的服务器信息")
+                return
+            yield event.plain_result(dump_server_list(json_data))
+        except Exception as e:
+            logger.error(f"执行 mcexport 命令时出错: {e}")
+            yield event.plain_result("导出服务器列表时发生错误")
+
     @filter.command("mcget")
     async def mcget(self, event: AstrMessageEvent, name: str):
         """
         获取指定服务器的信息
         """
         group_id = event.get_group_id()
-        json_path = await self.get_json_path(group_id)
-        json_data = await read_json(json_path)
+        json_data = await self.registry.get_group(group_id)
         if not json_data:
             yield event.plain_result("没有可用的服务器信息")
             return
@@ -202,26 +515,305 @@ class MyPlugin(Star):
         server_info = json_data[name]
         yield event.plain_result(f"{server_info['name']} 的地址是:")
         yield event.plain_result(f"{server_info['host']}")
+        if server_info.get('provider'):
+            yield event.plain_result(f"玩家列表: {server_info['provider']} {server_info.get('provider_url', '')}")
+
+    @filter.command("mcmap")
+    async def mcmap(self, event: AstrMessageEvent, name: str, provider: str = "", url: str = ""):
+        """
+        设置服务器的网页地图玩家列表来源
+
+        Args:
+            event: 消息事件
+            name: 服务器名称
+            provider: 提供者类型(dynmap/bluemap/squaremap/json)，off 表示取消，留空时显示当前设置
+            url: 玩家列表JSON地址
+        """
+        group_id = event.get_group_id()
+        try:
+            json_data = await self.registry.get_group(group_id)
+            if name not in json_data:
+                yield event.plain_result(f"没有找到服务器 {name}")
+                return
+
+            provider = provider.strip().lower()
+            if not provider:
+                current = json_data[name].get('provider')
+                if current:
+                    yield event.plain_result(f"{name} 的玩家列表来源: {current} {json_data[name].get('provider_url', '')}")
+                else:
+                    yield event.plain_result(f"{name} 未设置玩家列表来源")
+                return
+
+            if provider == "off":
+                await self.registry.set_provider(group_id, name)
+                self._on_group_changed(group_id)
+                yield event.plain_result(f"已取消 {name} 的玩家列表来源")
+                return
+
+            error = validate_provider(provider, url)
+            if error:
+                yield event.plain_result(error)
+                return
+
+            names = await player_list_client.fetch(provider, url)
+            if names is None:
+                yield event.plain_result("无法从该地址获取玩家列表，请检查类型和地址")
+                return
+            await self.registry.set_provider(group_id, name, provider, url)
+            self._on_group_changed(group_id)
+            yield event.plain_result(f"已设置 {name} 的玩家列表来源，当前在线 {len(names)} 人")
+        except Exception as e:
+            logger.error(f"执行 mcmap 命令时出错: {e}")
+            yield event.plain_result("设置玩家列表来源时发生错误")
+
+    @filter.command("mcstats")
+    async def mcstats(self, event: AstrMessageEvent, name: str, period: str = "24h"):
+        """
+        查看服务器在线人数和延迟的历史趋势
+
+        Args:
+            event: 消息事件
+            name: 服务器名称
+            period: 时间范围，如 6h、24h、7d
+        """
+        if not self.config.get("history_enabled", True):
+            yield event.plain_result("未启用历史记录")
+            return
+
+        match = re.match(r'^(\d+)([hd])$', period.strip().lower())
+        if not match or int(match.group(1)) <= 0:
+            yield event.plain_result("时间范围格式不正确，例如 6h、24h、7d")
+            return
+        span = int(match.group(1)) * (3600 if match.group(2) == "h" else 86400)
+
+        try:
+            json_data = await self.registry.get_group(event.get_group_id())
+            if name not in json_data:
+                yield event.plain_result(f"没有找到服务器 {name}")
+                return
+
+            step, points = history_store.query(json_data[name]['host'], span)
+            if not points:
+                yield event.plain_result(f"服务器 {name} 暂无历史数据，使用 /mc 查询或启用后台轮询后会开始记录")
+                return
+
+            end = int(time.time())
+            chart = await generate_history_chart(
+                server_name=name,
+                range_label=f"最近 {period}",
+                points=points,
+                start=end - span,
+                end=end,
+                step=step
+            )
+            yield event.chain_result([await self.to_image(chart)])
+        except Exception as e:
+            logger.error(f"执行 mcstats 命令时出错: {e}")
+            yield event.plain_result("生成历史趋势图时发生错误")
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("mcperf")
+    async def mcperf(self, event: AstrMessageEvent, host: str = ""):
+        """
+        (管理员)查看各阶段耗时分布和缓存/连接池统计
+
+        Args:
+            event: 消息事件
+            host: 指定时只显示该地址的各阶段耗时
+        """
+        title = f"{host} 各阶段耗时" if host else "各阶段耗时"
+        lines = [f"{title}(次数 平均/p50/p95/p99 ms):"]
+        stages = metrics.snapshot(host or None)
+        if not stages:
+            lines.append("暂无数据")
+        for stage, row in stages.items():
+            lines.append(f"{stage}  {row['count']}  {row['avg']}/{row['p50']}/{row['p95']}/{row['p99']}")
+
+        if not host:
+            slowest = metrics.slowest_hosts("fetch")
+            if slowest:
+                lines.append("")
+                lines.append("最慢的服务器(查询 p50/p95 ms):")
+                lines.extend(f"{name}  {p50}/{p95}" for name, p50, p95 in slowest)
+            lines.append("")
+            for name, counters in self.perf_counters().items():
+                lines.append(f"{name}: " + ", ".join(f"{k}={v}" for k, v in counters.items()))
+        yield event.plain_result("\n".join(lines))
+
+    def perf_counters(self) -> dict:
+        """各缓存、连接池和后台任务的计数器"""
+        counters = {
+            "reply_cache": reply_cache.stats(),
+            "status_cache": status_cache.stats(),
+            "dns_cache": resolver_cache.stats(),
+            "render_cache": render_cache.stats(),
+            "render_pool": render_pool.stats(),
+            "image_store": image_store.stats(),
+            "text_measure": text_measurer.stats(),
+            "slp": slp_client.stats(),
+            "players_http": player_list_client.stats(),
+            "breaker": circuit_breaker.stats(),
+            "history": history_store.stats(),
+        }
+        if self.poller is not None:
+            counters["poller"] = self.poller.stats()
+        return counters
+
+    async def to_image(self, data: bytes) -> Comp.Image:
+        """
+        把渲染结果转换为图片消息组件
+
+        优先写入图片缓存目录并按文件路径发送(原始字节，不经过base64)，
+        配置为 base64 或写入失败时回退为base64字符串
+
+        Args:
+            data: 编码后的图片数据
+
+        Returns:
+            图片消息组件
+        """
+        path = await image_store.path_for(data)
+        if path is not None:
+            return Comp.Image.fromFileSystem(path)
+        return Comp.Image.fromBase64(base64.b64encode(data).decode("utf-8"))
+
+    @staticmethod
+    def failure_text(host: str) -> str:
+        """
+        查询失败的服务器在卡片上显示的文字
+
+        熔断中显示"连接被拒绝 · 自 …"，尚未熔断时显示最近一次失败的类型
+        """
+        offline = circuit_breaker.offline_info(host)
+        if offline is not None:
+            return describe_offline(offline)
+        error_kind = circuit_breaker.last_error(host)
+        return ERROR_LABELS.get(error_kind, "查询失败/超时") if error_kind else "查询失败/超时"
+
+    def _on_group_changed(self, group_id: str) -> None:
+        """服务器列表变化后丢弃该群复用的 /mc 回复，并通知后台轮询重新加载地址"""
+        reply_cache.invalidate(group_id)
+        if self.poller is not None:
+            self.poller.request_reload()
+
+    async def get_status(self, host: str) -> Tuple[Optional[dict], str]:
+        """
+        获取服务器状态，启用后台轮询且快照足够新时直接使用快照
+
+        Args:
+            host: 服务器地址
+
+        Returns:
+            (状态信息或None, 快照更新时间文字；实时查询时为空字符串)
+        """
+        if self.poller is not None:
+            snapshot = self.poller.get_snapshot(host, self.snapshot_max_age)
+            if snapshot is not None:
+                info = dict(snapshot.info) if snapshot.info else None
+                return info, format_age(snapshot.age)
+        return await get_server_status(host), ""
+
+    async def get_info_limited(self, semaphore: asyncio.Semaphore, name: str, server_info: dict) -> dict:
+        """
+        在并发限制和超时限制下获取单个服务器的状态，用于汇总图
+
+        Args:
+            semaphore: 限制并发数量的信号量
+            name: 服务器在配置中的键名
+            server_info: 服务器配置信息
+
+        Returns:
+            汇总图条目，state 为 online/offline/timeout
+        """
+        entry = {"server_name": server_info['name'], "state": "offline"}
+        async with semaphore:
+            try:
+                info, updated_text = await asyncio.wait_for(
+                    self.get_status(server_info['host']), timeout=self.server_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"服务器 {name} 查询超时({self.server_timeout}s)")
+                entry["state"] = "timeout"
+                return entry
+            except Exception as e:
+                logger.error(f"处理服务器 {name} 时出错: {e}")
+                return entry
+
+        if info:
+            entry.update(
+                state="online",
+                latency=info['latency'],
+                plays_online=info['plays_online'],
+                plays_max=info['plays_max'],
+                server_version=info['server_version'],
+                icon_base64=info['icon_base64'],
+            )
+        else:
+            entry["detail"] = self.failure_text(server_info['host'])
+        if updated_text:
+            entry["updated_text"] = updated_text
+        return entry
 
-    async def get_img(self, server_name: str, host: str) -> Optional[str]:
+    async def get_img_limited(self, semaphore: asyncio.Semaphore, name: str, server_info: dict) -> Optional[List[bytes]]:
+        """
+        在并发限制和超时限制下获取单个服务器的图片
+
+        Args:
+            semaphore: 限制并发数量的信号量
+            name: 服务器在配置中的键名
+            server_info: 服务器配置信息
+
+        Returns:
+            编码后的图片数据列表，超时则返回紧凑的超时图片，失败则返回None
+        """
+        async with semaphore:
+            try:
+                logger.debug(f"正在处理服务器: {name}, 信息: {server_info}")
+                return await asyncio.wait_for(
+                    self.get_img(server_info['name'], server_info['host'],
+                                 server_info.get('provider', ''), server_info.get('provider_url', '')),
+                    timeout=self.server_timeout
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"服务器 {name} 查询超时({self.server_timeout}s)")
+                try:
+                    return [await generate_placeholder_image(server_info['name'], "查询超时")]
+                except Exception as e:
+                    logger.error(f"生成服务器 {name} 的超时图片时出错: {e}")
+                    return None
+            except Exception as e:
+                logger.error(f"处理服务器 {name} 时出错: {e}")
+                return None
+
+    async def get_img(self, server_name: str, host: str, provider: str = "",
+                      provider_url: str = "") -> Optional[List[bytes]]:
         """
         获取服务器信息图片
 
         Args:
             server_name: 服务器名称
             host: 服务器地址
+            provider: 网页地图玩家列表类型，为空时使用状态查询得到的玩家列表
+            provider_url: 玩家列表JSON地址
 
         Returns:
-            图片的base64编码字符串，如果获取失败则返回None
+            编码后的图片数据列表(玩家过多分页时有多张)，查询失败时为占位图片，出错时返回None
         """
-        logger.info(f"开始获取服务器 {server_name} 的图片，主机地址: {host}")
+        logger.debug(f"开始获取服务器 {server_name} 的图片，主机地址: {host}")
         try:
-            info = await get_server_status(host)
+            info, updated_text = await self.get_status(host)
             if not info:
-                logger.error(f"无法获取服务器 {server_name} 的状态信息")
-                return None
+                # 查询失败也显示紧凑的占位卡片，保持卡片数量和顺序不变；
+                # 占位图片经过渲染缓存，几乎没有开销
+                logger.warning(f"无法获取服务器 {server_name} 的状态信息")
+                return [await generate_placeholder_image(server_name, self.failure_text(host))]
 
             info['server_name'] = server_name
+            if provider and provider_url:
+                # 网页地图获取失败时保留 query/样本中的玩家列表
+                names = await player_list_client.fetch(provider, provider_url)
+                if names is not None:
+                    info['players_list'] = names
             mcinfo_img = await generate_server_info_image(
                 players_list=info['players_list'],
                 latency=info['latency'],
@@ -229,27 +821,12 @@ class MyPlugin(Star):
                 plays_max=info['plays_max'],
                 plays_online=info['plays_online'],
                 server_version=info['server_version'],
-                icon_base64=info['icon_base64']
+                icon_base64=info['icon_base64'],
+                updated_text=updated_text
             )
-            logger.info(f"成功生成服务器 {server_name} 的图片")
+            logger.debug(f"成功生成服务器 {server_name} 的图片")
             return mcinfo_img
 
         except Exception as e:
             logger.error(f"获取服务器 {server_name} 的图片时出错: {e}")
             return None
-
-    async def get_json_path(self, group_id: str) -> Path:
-        """
-        获取群组的JSON配置文件路径
-
-        Args:
-            group_id: 群组ID
-
-        Returns:
-            JSON文件的Path对象
-        """
-        data_path = StarTools.get_data_dir("astrbot_mcgetter")
-        json_path = data_path / f'{group_id}.json'
-        json_path.parent.mkdir(parents=True, exist_ok=True)
-        logger.info(f"群号 {group_id} 的 JSON 文件路径: {json_path}")
-        return json_path
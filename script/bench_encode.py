@@ -0,0 +1,86 @@
+"""
+图片编码基准测试
+
+在插件目录下运行:
+    python -m script.bench_encode [--repeat 10] [--json]
+
+对几种典型卡片分别尝试各个编码选项，报告平均编码耗时和输出大小，
+用于在带宽受限的平台上选择 image_format 等配置。
+"""
+import argparse
+import json
+import time
+from typing import Any, Dict, List
+
+from .get_img import draw_server_info_image, draw_dashboard_image
+from .image_encode import DEFAULT_ENCODING, encode_image
+
+# 待比较的编码选项
+CANDIDATES: List[Dict[str, Any]] = [
+    {"format": "png"},
+    {"format": "png", "compress_level": 1},
+    {"format": "png", "compress_level": 9, "optimize": True},
+    {"format": "png_palette"},
+    {"format": "png_palette", "palette_colors": 64},
+    {"format": "webp", "quality": 80},
+    {"format": "webp_lossless"},
+    {"format": "jpeg", "quality": 85},
+    {"format": "jpeg", "quality": 70},
+]
+
+
+def sample_cards() -> Dict[str, Any]:
+    """生成几种典型卡片"""
+    players = [f"Player_{i:03d}" for i in range(60)]
+    return {
+        "idle": draw_server_info_image([], 42, "空闲服务器", 20, 0, "Paper 1.20.4"),
+        "small": draw_server_info_image(players[:6], 87, "小型服务器", 20, 6, "Paper 1.20.4"),
+        "busy": draw_server_info_image(players, 156, "热门服务器", 100, 60, "Velocity 3.3.0"),
+        "dashboard": draw_dashboard_image([
+            {"server_name": f"服务器{i}", "state": "online", "latency": 30 + i * 20,
+             "plays_online": i, "plays_max": 20, "server_version": "Paper 1.20.4"}
+            for i in range(8)
+        ]),
+    }
+
+
+def run(repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    for card_name, img in sample_cards().items():
+        for candidate in CANDIDATES:
+            encoding = dict(DEFAULT_ENCODING, **candidate)
+            data = encode_image(img, encoding)  # 预热
+            start = time.perf_counter()
+            for _ in range(repeat):
+                data = encode_image(img, encoding)
+            elapsed_ms = (time.perf_counter() - start) * 1000 / repeat
+            results.append({
+                "card": card_name,
+                "size": f"{img.width}x{img.height}",
+                "encoding": candidate,
+                "encode_ms": round(elapsed_ms, 2),
+                "bytes": len(data),
+                "base64_bytes": (len(data) + 2) // 3 * 4,
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="图片编码基准测试")
+    parser.add_argument("--repeat", type=int, default=10, help="每个选项的编码次数")
+    parser.add_argument("--json", action="store_true", help="输出JSON结果")
+    args = parser.parse_args()
+
+    results = run(max(1, args.repeat))
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    print(f"{'card':<10} {'size':<10} {'encoding':<58} {'ms':>8} {'bytes':>9}")
+    for row in results:
+        encoding = json.dumps(row["encoding"], ensure_ascii=False)
+        print(f"{row['card']:<10} {row['size']:<10} {encoding:<58} {row['encode_ms']:>8.2f} {row['bytes']:>9}")
+
+
+if __name__ == "__main__":
+    main()
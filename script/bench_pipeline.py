@@ -0,0 +1,259 @@
+"""
+查询与渲染流水线基准测试(不需要网络)
+
+在插件目录下运行:
+    python -m script.bench_pipeline [--sizes 1,10,100,500] [--repeat 3] [--json] [--output result.json]
+
+启动一组本地模拟服务器(script.fake_server)，分别测量:
+- status: get_server_status 冷查询(不经过状态缓存)
+- render_cold / render_warm: generate_server_info_image 无缓存 / 命中渲染缓存
+- mc: 通过插件的 /mc 命令处理函数执行完整流程(并发限制、超时占位、网页地图玩家列表、
+  渲染和图片缓存目录)，每个样本为一次 /mc，不使用状态缓存、渲染缓存和回复复用
+输出每个阶段的吞吐量和 p50/p99 延迟，--json 时输出机器可读的结果，便于比较回归。
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import math
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .fake_server import FakeServerFarm, make_configs
+from .get_server_info import get_server_status, configure_status_client
+from .get_img import generate_server_info_image
+from .status_cache import status_cache
+from .render_cache import render_cache
+from .render_pool import render_pool
+from .circuit_breaker import circuit_breaker
+from .slp import slp_client
+from .image_store import image_store
+
+
+def percentile(samples: List[float], p: float) -> float:
+    """最近秩法计算百分位数"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+async def _timed_all(items: List[Any], func: Callable[[Any], Awaitable[Any]],
+                     concurrency: int) -> Dict[str, Any]:
+    """在并发限制下对每个元素调用 func，记录单次耗时和总耗时"""
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: List[float] = []
+    errors = 0
+
+    async def run(item):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                result = await func(item)
+            except Exception:
+                result = None
+            samples.append((time.perf_counter() - start) * 1000)
+            if result is None:
+                errors += 1
+            return result
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*[run(item) for item in items])
+    return {"results": results, "samples": samples, "errors": errors,
+            "wall_s": time.perf_counter() - start}
+
+
+def _summary(stage: str, servers: int, runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    samples = [sample for run in runs for sample in run["samples"]]
+    wall = sum(run["wall_s"] for run in runs)
+    return {
+        "stage": stage,
+        "servers": servers,
+        "samples": len(samples),
+        "errors": sum(run["errors"] for run in runs),
+        "wall_s": round(wall, 4),
+        "throughput": round(len(samples) / wall, 2) if wall else 0.0,
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "max_ms": round(max(samples, default=0.0), 3),
+    }
+
+
+async def _render(info: Optional[Dict[str, Any]]) -> Optional[List[bytes]]:
+    if info is None:
+        return None
+    return await generate_server_info_image(
+        players_list=info['players_list'],
+        latency=info['latency'],
+        server_name=info['server_name'],
+        plays_max=info['plays_max'],
+        plays_online=info['plays_online'],
+        server_version=info['server_version'],
+        icon_base64=info['icon_base64']
+    )
+
+
+class _BenchEvent:
+    """最小的消息事件，用于直接调用 /mc 命令处理函数"""
+
+    def __init__(self, group_id: str):
+        self.group_id = group_id
+        self.message_str = "mc"
+
+    def get_group_id(self) -> str:
+        return self.group_id
+
+    def plain_result(self, text: str) -> List[Any]:
+        return []
+
+    def chain_result(self, chain: List[Any]) -> List[Any]:
+        return chain
+
+
+def _make_plugin(args, data_dir: Path):
+    """按基准测试参数创建插件实例，服务器列表和图片缓存放在临时目录"""
+    from ..main import MyPlugin
+    from .registry import ServerRegistry
+
+    plugin = MyPlugin(None, {
+        "max_concurrency": args.concurrency,
+        "status_client": args.client,
+        "slp_timeout": args.timeout,
+        "render_pool_mode": args.render_mode,
+        "status_cache_ttl": 0,
+        "breaker_failure_threshold": 0,
+        "mc_reply_reuse": 0,
+        "history_enabled": False,
+    })
+    plugin.registry = ServerRegistry(data_dir / "servers", flush_delay=0)
+    image_store.configure(directory=data_dir / "images")
+    return plugin
+
+
+async def bench_size(plugin, addresses: List[str], repeat: int, concurrency: int,
+                     cache_bytes: int) -> List[Dict[str, Any]]:
+    """对一组服务器地址运行所有阶段"""
+    servers = len(addresses)
+    results = []
+
+    # status: 每次都是冷查询
+    status_runs = []
+    for _ in range(repeat):
+        status_runs.append(await _timed_all(
+            addresses, lambda host: get_server_status(host, use_cache=False), concurrency))
+    results.append(_summary("status", servers, status_runs))
+
+    infos = [dict(info, server_name=f"服务器{index}")
+             for index, info in enumerate(status_runs[-1]["results"]) if info]
+
+    # render_cold: 禁用渲染缓存；render_warm: 先填充缓存再测量
+    render_cache.configure(max_bytes=0)
+    results.append(_summary("render_cold", servers, [
+        await _timed_all(infos, _render, concurrency) for _ in range(repeat)]))
+    render_cache.configure(max_bytes=cache_bytes)
+    await _timed_all(infos, _render, concurrency)
+    results.append(_summary("render_warm", servers, [
+        await _timed_all(infos, _render, concurrency) for _ in range(repeat)]))
+
+    # mc: 通过 /mc 命令处理函数执行完整流程，卡片数少于服务器数时记为错误
+    render_cache.configure(max_bytes=0)
+    group_id = f"bench_{servers}"
+    await plugin.registry.add_many(group_id, [
+        {'name': f"服务器{index}", 'host': host} for index, host in enumerate(addresses)])
+
+    async def mc_run(_):
+        chains = [chain async for chain in plugin.mcgetter(_BenchEvent(group_id))]
+        return chains[0] if chains and len(chains[0]) >= servers else None
+
+    results.append(_summary("mc", servers, [
+        await _timed_all(list(range(repeat)), mc_run, 1)]))
+    render_cache.configure(max_bytes=cache_bytes)
+    return results
+
+
+async def run(args) -> Dict[str, Any]:
+    sizes = sorted({max(1, int(size)) for size in args.sizes.split(",")})
+    data_dir = Path(tempfile.mkdtemp(prefix="mcgetter_bench_"))
+    plugin = _make_plugin(args, data_dir)
+    configure_status_client(args.client)
+    slp_client.configure(timeout=args.timeout)
+    # 测量原始查询开销：不缓存状态、不熔断
+    status_cache.configure(ttl=0)
+    circuit_breaker.configure(failure_threshold=0)
+    render_pool.configure(mode=args.render_mode)
+    cache_bytes = render_cache.max_bytes
+
+    configs = make_configs(max(sizes), latency_ms=(args.min_latency, args.max_latency),
+                           failure_rate=args.failure_rate, seed=args.seed)
+    results = []
+    try:
+        async with FakeServerFarm(configs) as farm:
+            for size in sizes:
+                results.extend(await bench_size(plugin, farm.addresses[:size], args.repeat,
+                                                args.concurrency, cache_bytes))
+    finally:
+        await plugin.terminate()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "status_client": args.client,
+            "render_mode": args.render_mode,
+            "concurrency": args.concurrency,
+            "repeat": args.repeat,
+            "latency_ms": [args.min_latency, args.max_latency],
+            "failure_rate": args.failure_rate,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+
+def main():
+    if "." not in (__package__ or ""):
+        # 以 python -m script.bench_pipeline 运行时，以插件包的身份重新导入本模块，
+        # 使 main.py 的相对导入与本模块使用同一组共享实例
+        root = Path(__file__).resolve().parents[1]
+        sys.path.insert(0, str(root.parent))
+        return importlib.import_module(f"{root.name}.script.bench_pipeline").main()
+
+    parser = argparse.ArgumentParser(description="查询与渲染流水线基准测试")
+    parser.add_argument("--sizes", default="1,10,100,500", help="服务器数量，逗号分隔")
+    parser.add_argument("--repeat", type=int, default=3, help="每个阶段的重复次数")
+    parser.add_argument("--concurrency", type=int, default=8, help="并发数(对应 max_concurrency)")
+    parser.add_argument("--client", choices=("native", "mcstatus"), default="native", help="状态查询客户端")
+    parser.add_argument("--render-mode", choices=("thread", "process"), default="thread", help="渲染池模式")
+    parser.add_argument("--timeout", type=float, default=1.0, help="单次查询超时(秒)")
+    parser.add_argument("--min-latency", type=float, default=5.0, help="模拟服务器最小延迟(毫秒)")
+    parser.add_argument("--max-latency", type=float, default=50.0, help="模拟服务器最大延迟(毫秒)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="故障服务器比例")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--json", action="store_true", help="输出JSON结果")
+    parser.add_argument("--output", help="同时把JSON结果写入文件")
+    args = parser.parse_args()
+    args.repeat = max(1, args.repeat)
+
+    report = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+
+    print(f"{'stage':<12} {'servers':>7} {'samples':>7} {'errors':>6} {'ops/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for row in report["results"]:
+        print(f"{row['stage']:<12} {row['servers']:>7} {row['samples']:>7} {row['errors']:>6} "
+              f"{row['throughput']:>9.2f} {row['p50_ms']:>9.2f} {row['p99_ms']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
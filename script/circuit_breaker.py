@@ -0,0 +1,156 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from astrbot.api import logger
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# 失败类型 -> 显示文字
+ERROR_LABELS = {
+    "dns": "域名解析失败",
+    "refused": "连接被拒绝",
+    "timeout": "连接超时",
+    "error": "查询失败",
+}
+
+
+@dataclass
+class BreakerState:
+    """单个地址的熔断状态"""
+    state: str = CLOSED
+    failures: int = 0  # 连续失败次数
+    error_kind: str = "error"  # 最近一次失败的类型
+    offline_since: float = 0.0  # 首次连续失败的时间(time.time())
+    retry_at: float = 0.0  # 允许下一次探测的时间(time.monotonic())
+
+
+class CircuitBreaker:
+    """
+    离线服务器的熔断器(负缓存)
+
+    - closed: 正常查询；连续失败 failure_threshold 次后进入 open
+    - open: 不做DNS解析和连接，直接返回离线；等待时间按指数增长直到 max_interval
+    - half_open: 等待结束后只由一个后台探测决定恢复(closed)还是继续熔断(open)
+    """
+
+    def __init__(self, failure_threshold: int = 2, base_interval: float = 30.0, max_interval: float = 1800.0):
+        self.failure_threshold = failure_threshold
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self._states: Dict[str, BreakerState] = {}
+        self._probes: Dict[str, asyncio.Task] = {}
+        self.short_circuits = 0
+
+    def configure(self, failure_threshold: Optional[int] = None, base_interval: Optional[float] = None,
+                  max_interval: Optional[float] = None) -> None:
+        """
+        更新熔断参数
+
+        Args:
+            failure_threshold: 连续失败多少次后熔断，为0时禁用熔断
+            base_interval: 首次熔断的等待时间(秒)
+            max_interval: 最长等待时间(秒)
+        """
+        if failure_threshold is not None:
+            self.failure_threshold = max(0, int(failure_threshold))
+        if base_interval is not None:
+            self.base_interval = max(1.0, float(base_interval))
+        if max_interval is not None:
+            self.max_interval = max(self.base_interval, float(max_interval))
+
+    @staticmethod
+    def _key(host: str) -> str:
+        return host.strip().lower()
+
+    def allow(self, host: str, probe: Callable[[], Awaitable[Any]]) -> bool:
+        """
+        是否允许立即查询该地址
+
+        熔断中返回False；等待时间已到且没有正在进行的探测时，
+        在后台启动一次 probe()，由它的结果决定熔断器状态。
+        """
+        if self.failure_threshold <= 0:
+            return True
+        key = self._key(host)
+        entry = self._states.get(key)
+        if entry is None or entry.state == CLOSED:
+            return True
+
+        self.short_circuits += 1
+        if entry.state == OPEN and time.monotonic() >= entry.retry_at and key not in self._probes:
+            entry.state = HALF_OPEN
+            task = asyncio.ensure_future(probe())
+            self._probes[key] = task
+            task.add_done_callback(lambda t, k=key: self._on_probe_done(k, t))
+            logger.debug(f"{host} 熔断等待结束，后台探测中")
+        return False
+
+    def _on_probe_done(self, key: str, task: asyncio.Task) -> None:
+        self._probes.pop(key, None)
+        entry = self._states.get(key)
+        # 探测被取消或没有记录结果时回到 open，等待下一次探测
+        if entry is not None and entry.state == HALF_OPEN:
+            entry.state = OPEN
+            entry.retry_at = time.monotonic() + self._interval(entry.failures)
+        if not task.cancelled():
+            task.exception()
+
+    def _interval(self, failures: int) -> float:
+        exponent = max(failures - self.failure_threshold, 0)
+        return min(self.base_interval * (2 ** min(exponent, 30)), self.max_interval)
+
+    def record_success(self, host: str) -> None:
+        entry = self._states.pop(self._key(host), None)
+        if entry is not None and entry.state != CLOSED:
+            logger.info(f"{host} 已恢复在线")
+
+    def record_failure(self, host: str, error_kind: str = "error") -> None:
+        """记录一次失败，error_kind 为 dns/refused/timeout/error"""
+        if self.failure_threshold <= 0:
+            return
+        key = self._key(host)
+        entry = self._states.get(key)
+        if entry is None:
+            entry = self._states[key] = BreakerState(offline_since=time.time())
+        entry.failures += 1
+        entry.error_kind = error_kind
+        if entry.failures >= self.failure_threshold:
+            interval = self._interval(entry.failures)
+            entry.state = OPEN
+            entry.retry_at = time.monotonic() + interval
+            logger.debug(f"{host} 连续失败 {entry.failures} 次({error_kind})，{interval:.0f}s 内不再查询")
+
+    def offline_info(self, host: str) -> Optional[BreakerState]:
+        """熔断中(open/half_open)时返回状态，否则返回None"""
+        entry = self._states.get(self._key(host))
+        if entry is None or entry.state == CLOSED:
+            return None
+        return entry
+
+    def last_error(self, host: str) -> Optional[str]:
+        """最近一次失败的类型(尚未熔断时也返回)，没有失败记录时返回None"""
+        entry = self._states.get(self._key(host))
+        return entry.error_kind if entry is not None else None
+
+    def stats(self) -> Dict[str, int]:
+        """返回熔断统计信息"""
+        return {
+            "tracked": len(self._states),
+            "open": sum(1 for entry in self._states.values() if entry.state != CLOSED),
+            "probing": len(self._probes),
+            "short_circuits": self.short_circuits,
+        }
+
+
+def describe_offline(entry: BreakerState) -> str:
+    """离线卡片上显示的文字，如 "连接被拒绝 · 自 10-17 14:05" """
+    since = time.strftime("%m-%d %H:%M", time.localtime(entry.offline_since))
+    return f"{ERROR_LABELS.get(entry.error_kind, ERROR_LABELS['error'])} · 自 {since}"
+
+
+# 进程级共享实例
+circuit_breaker = CircuitBreaker()
@@ -0,0 +1,204 @@
+import asyncio
+import ipaddress
+import socket
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import dns.asyncresolver
+import dns.exception
+import dns.resolver
+from dns.rdatatype import RdataType
+
+from astrbot.api import logger
+
+DEFAULT_PORT = 25565
+
+
+@dataclass
+class ResolvedAddress:
+    """解析后的服务器地址"""
+    host: str  # 握手使用的主机名(SRV目标或原主机)
+    ip: str  # 实际连接的IP
+    port: int
+    expires_at: float  # 超过该时间需要重新解析
+    stale_until: float  # 超过该时间不再返回过期结果
+
+
+def split_host_port(address: str) -> Tuple[str, Optional[int]]:
+    """
+    拆分 "host[:port]" 形式的地址
+
+    Args:
+        address: 服务器地址
+
+    Returns:
+        (主机, 端口)，未指定端口时端口为None
+    """
+    address = address.strip()
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit() and host and ":" not in host:
+        return host, int(port)
+    return address, None
+
+
+def is_ip_literal(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+class ResolverCache:
+    """
+    Minecraft 服务器地址解析缓存
+
+    缓存 SRV 及 A/AAAA 解析结果，有效期取记录 TTL 并限制在 [min_ttl, max_ttl] 内。
+    过期后的 stale_ttl 秒内仍直接返回旧结果，同时在后台刷新(stale-while-revalidate)。
+    """
+
+    def __init__(self, min_ttl: float = 60.0, max_ttl: float = 3600.0,
+                 stale_ttl: float = 600.0, lifetime: float = 3.0, max_size: int = 1024):
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.stale_ttl = stale_ttl
+        self.lifetime = lifetime
+        self.max_size = max_size
+        self._entries: Dict[str, ResolvedAddress] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def configure(self, min_ttl: Optional[float] = None, max_ttl: Optional[float] = None,
+                  stale_ttl: Optional[float] = None) -> None:
+        """更新缓存有效期参数"""
+        if min_ttl is not None:
+            self.min_ttl = max(0.0, float(min_ttl))
+        if max_ttl is not None:
+            self.max_ttl = max(self.min_ttl, float(max_ttl))
+        if stale_ttl is not None:
+            self.stale_ttl = max(0.0, float(stale_ttl))
+
+    async def resolve(self, address: str) -> ResolvedAddress:
+        """
+        解析服务器地址，优先使用缓存
+
+        Args:
+            address: 用户保存的服务器地址
+
+        Returns:
+            解析结果
+
+        Raises:
+            socket.gaierror: 无法解析主机时抛出
+        """
+        key = address.strip().lower()
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if now < entry.expires_at:
+                self.hits += 1
+                return entry
+            if now < entry.stale_until:
+                self.stale_hits += 1
+                # 后台刷新，本次直接返回旧结果
+                self._refresh(key, address)
+                return entry
+
+        self.misses += 1
+        return await asyncio.shield(self._refresh(key, address))
+
+    def _refresh(self, key: str, address: str) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._lookup(address))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._on_done(k, t))
+        return task
+
+    def _on_done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            self.errors += 1
+            logger.debug(f"解析 {key} 失败: {task.exception()}")
+            return
+        if len(self._entries) >= self.max_size and key not in self._entries:
+            # 淘汰最早过期的条目
+            oldest = min(self._entries, key=lambda k: self._entries[k].stale_until)
+            del self._entries[oldest]
+        self._entries[key] = task.result()
+
+    async def _lookup(self, address: str) -> ResolvedAddress:
+        host, port = split_host_port(address)
+        ttls = []
+
+        if port is None and not is_ip_literal(host):
+            try:
+                answer = await dns.asyncresolver.resolve(
+                    "_minecraft._tcp." + host, RdataType.SRV,
+                    lifetime=self.lifetime, search=True)
+                record = answer[0]
+                host = str(record.target).rstrip(".")
+                port = int(record.port)
+                ttls.append(answer.rrset.ttl)
+            except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+                pass
+            except dns.exception.DNSException as e:
+                logger.debug(f"查询 {host} 的SRV记录失败: {e}")
+        if port is None:
+            port = DEFAULT_PORT
+
+        ip, ttl = await self._resolve_ip(host)
+        if ttl is not None:
+            ttls.append(ttl)
+
+        ttl = min(ttls) if ttls else self.min_ttl
+        ttl = min(max(ttl, self.min_ttl), self.max_ttl)
+        now = time.monotonic()
+        return ResolvedAddress(
+            host=host,
+            ip=ip,
+            port=port,
+            expires_at=now + ttl,
+            stale_until=now + ttl + self.stale_ttl,
+        )
+
+    async def _resolve_ip(self, host: str) -> Tuple[str, Optional[int]]:
+        if is_ip_literal(host):
+            return host, None
+
+        # 优先IPv4
+        for rdtype in (RdataType.A, RdataType.AAAA):
+            try:
+                answer = await dns.asyncresolver.resolve(
+                    host, rdtype, lifetime=self.lifetime, search=True,
+                    raise_on_no_answer=False)
+            except dns.exception.DNSException:
+                break
+            if answer.rrset is not None and len(answer.rrset) > 0:
+                return str(answer.rrset[0]).rstrip("."), answer.rrset.ttl
+
+        # DNS查询失败时回退到系统解析(hosts文件等)，此时没有TTL信息
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        return infos[0][4][0], None
+
+    def stats(self) -> Dict[str, int]:
+        """返回缓存统计信息"""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+
+# 进程级共享实例
+resolver_cache = ResolverCache()
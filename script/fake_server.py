@@ -0,0 +1,259 @@
+"""
+本地模拟 Minecraft 服务器，用于基准测试和离线调试
+
+支持 Server List Ping(状态 + ping/pong, TCP) 和 GameSpy4 query(UDP，同一端口)，
+可配置响应延迟、玩家数量、是否有图标以及故障类型。
+
+单独运行(Ctrl+C 退出):
+    python -m script.fake_server [--count 5] [--players 20] [--latency 20]
+"""
+import argparse
+import asyncio
+import base64
+import json
+import random
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from .slp import _read_varint, _packet, encode_varint
+
+# 故障类型: none 正常; refuse 接受连接后立即关闭; timeout 不响应; garbage 返回无法解析的数据
+FAILURE_MODES = ("none", "refuse", "timeout", "garbage")
+
+# 1x1 透明 PNG，作为服务器图标
+_ICON_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg==")
+ICON_DATA_URI = "data:image/png;base64," + base64.b64encode(_ICON_PNG).decode()
+
+
+@dataclass
+class FakeServerConfig:
+    """单个模拟服务器的行为"""
+    latency_ms: float = 10.0  # 每次响应前的延迟
+    players: int = 5
+    max_players: int = 20
+    icon: bool = True
+    query: bool = True  # 是否响应 GameSpy query
+    failure: str = "none"
+    version: str = "Paper 1.20.4"
+    motd: str = "A Minecraft Server"
+    player_names: List[str] = field(default_factory=list)
+
+    def names(self) -> List[str]:
+        return self.player_names or [f"Player_{i:03d}" for i in range(self.players)]
+
+    def status_json(self) -> bytes:
+        data = {
+            "version": {"name": self.version, "protocol": 765},
+            "players": {
+                "online": self.players,
+                "max": self.max_players,
+                "sample": [{"name": name, "id": "00000000-0000-0000-0000-000000000000"}
+                           for name in self.names()[:12]],
+            },
+            "description": {"text": self.motd},
+        }
+        if self.icon:
+            data["favicon"] = ICON_DATA_URI
+        return json.dumps(data).encode("utf-8")
+
+
+class _QueryProtocol(asyncio.DatagramProtocol):
+    """GameSpy4 query: 握手(类型9)返回 challenge，完整状态(类型0)返回键值和玩家列表"""
+
+    def __init__(self, server: "FakeServer"):
+        self.server = server
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.challenge = random.randint(1, 2 ** 31 - 1)
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr):
+        config = self.server.config
+        if not config.query or config.failure != "none" or len(data) < 7 or data[:2] != b"\xfe\xfd":
+            return
+        packet_type, session = data[2], data[3:7]
+        if packet_type == 9:
+            response = b"\x09" + session + str(self.challenge).encode() + b"\x00"
+        elif packet_type == 0:
+            response = b"\x00" + session + self._full_stat()
+        else:
+            return
+        asyncio.get_running_loop().call_later(
+            config.latency_ms / 1000, self.transport.sendto, response, addr)
+
+    def _full_stat(self) -> bytes:
+        config = self.server.config
+        values = {
+            "hostname": config.motd,
+            "gametype": "SMP",
+            "game_id": "MINECRAFT",
+            "version": config.version,
+            "plugins": "",
+            "map": "world",
+            "numplayers": str(config.players),
+            "maxplayers": str(config.max_players),
+            "hostport": str(self.server.port),
+            "hostip": self.server.host,
+        }
+        parts = [b"splitnum\x00\x80\x00"]
+        for key, value in values.items():
+            parts.append(key.encode() + b"\x00" + value.encode("utf-8") + b"\x00")
+        parts.append(b"\x00\x01player_\x00\x00")
+        for name in config.names():
+            parts.append(name.encode("utf-8") + b"\x00")
+        parts.append(b"\x00")
+        return b"".join(parts)
+
+
+class FakeServer:
+    """单个模拟服务器，TCP(状态)和UDP(query)使用同一端口"""
+
+    def __init__(self, config: Optional[FakeServerConfig] = None, host: str = "127.0.0.1"):
+        self.config = config or FakeServerConfig()
+        self.host = host
+        self.port = 0
+        self.connections = 0
+        self._tcp: Optional[asyncio.AbstractServer] = None
+        self._udp: Optional[asyncio.DatagramTransport] = None
+
+    @property
+    def address(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    async def start(self, port: int = 0) -> None:
+        loop = asyncio.get_running_loop()
+        for _ in range(20):
+            self._tcp = await asyncio.start_server(self._handle, self.host, port)
+            self.port = self._tcp.sockets[0].getsockname()[1]
+            try:
+                self._udp, _ = await loop.create_datagram_endpoint(
+                    lambda: _QueryProtocol(self), local_addr=(self.host, self.port))
+                return
+            except OSError:
+                # UDP 端口被占用时换一个端口重试
+                self._tcp.close()
+                await self._tcp.wait_closed()
+                if port:
+                    raise
+        raise OSError("无法分配同时可用于TCP和UDP的端口")
+
+    async def stop(self) -> None:
+        if self._udp is not None:
+            self._udp.close()
+        if self._tcp is not None:
+            self._tcp.close()
+            await self._tcp.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        config = self.config
+        delay = config.latency_ms / 1000
+        try:
+            if config.failure == "refuse":
+                return
+            if config.failure == "timeout":
+                await reader.read()  # 等待客户端超时关闭
+                return
+
+            # 握手 + 状态请求
+            for _ in range(2):
+                await reader.readexactly(await _read_varint(reader))
+            await asyncio.sleep(delay)
+            if config.failure == "garbage":
+                writer.write(_packet(0x00, encode_varint(5) + b"{oops"))
+                await writer.drain()
+                return
+            body = config.status_json()
+            writer.write(_packet(0x00, encode_varint(len(body)) + body))
+            await writer.drain()
+
+            # ping/pong
+            payload = await reader.readexactly(await _read_varint(reader))
+            await asyncio.sleep(delay)
+            writer.write(encode_varint(len(payload)) + payload)
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+class FakeServerFarm:
+    """一组模拟服务器"""
+
+    def __init__(self, configs: List[FakeServerConfig], host: str = "127.0.0.1"):
+        self.servers = [FakeServer(config, host) for config in configs]
+
+    @property
+    def addresses(self) -> List[str]:
+        return [server.address for server in self.servers]
+
+    async def __aenter__(self) -> "FakeServerFarm":
+        await asyncio.gather(*[server.start() for server in self.servers])
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await asyncio.gather(*[server.stop() for server in self.servers])
+
+
+def make_configs(count: int, players: Tuple[int, int] = (0, 60), latency_ms: Tuple[float, float] = (5, 50),
+                 icon_rate: float = 0.8, query_rate: float = 0.7, failure_rate: float = 0.0,
+                 seed: int = 0) -> List[FakeServerConfig]:
+    """
+    按比例随机生成一组服务器配置(相同 seed 结果相同)
+
+    Args:
+        count: 服务器数量
+        players: 在线玩家数范围
+        latency_ms: 响应延迟范围(毫秒)
+        icon_rate: 有图标的比例
+        query_rate: 开启 query 的比例
+        failure_rate: 故障服务器的比例(在 refuse/timeout/garbage 中随机)
+        seed: 随机种子
+    """
+    rng = random.Random(seed)
+    configs = []
+    for _ in range(count):
+        online = rng.randint(*players)
+        configs.append(FakeServerConfig(
+            latency_ms=rng.uniform(*latency_ms),
+            players=online,
+            max_players=max(20, online),
+            icon=rng.random() < icon_rate,
+            query=rng.random() < query_rate,
+            failure=rng.choice(FAILURE_MODES[1:]) if rng.random() < failure_rate else "none",
+        ))
+    return configs
+
+
+async def _serve(args) -> None:
+    configs = [FakeServerConfig(latency_ms=args.latency, players=args.players,
+                                max_players=max(args.players, 20), icon=not args.no_icon,
+                                query=not args.no_query, failure=args.failure)
+               for _ in range(args.count)]
+    async with FakeServerFarm(configs, args.host) as farm:
+        for address in farm.addresses:
+            print(address)
+        await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟 Minecraft 服务器")
+    parser.add_argument("--count", type=int, default=1, help="服务器数量")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--players", type=int, default=5, help="在线玩家数")
+    parser.add_argument("--latency", type=float, default=10.0, help="响应延迟(毫秒)")
+    parser.add_argument("--no-icon", action="store_true", help="不返回服务器图标")
+    parser.add_argument("--no-query", action="store_true", help="不响应 query")
+    parser.add_argument("--failure", choices=FAILURE_MODES, default="none", help="故障类型")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,113 @@
 from PIL import Image, ImageDraw, ImageFont
-import asyncio
-import io
 from pathlib import Path
-import base64
-from typing import Optional
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from .render_pool import render_pool
+from .render_cache import render_cache
+from .icon_cache import icon_cache, ICON_MASK, ICON_SIZE
+from .image_encode import encode_image, get_encoding
+from .text_measure import text_measurer
+from .metrics import stage_timer
+
+
+# 候选字体路径，按顺序尝试
+FONT_CANDIDATES = [
+    Path(__file__).resolve().parent.parent/'resource'/'msyh.ttf',
+    'msyh.ttf',  # 当前目录
+    '/usr/share/fonts/zh_CN/msyh.ttf',  # Linux常见路径
+    'C:/Windows/Fonts/msyh.ttc',  # Windows路径
+    '/System/Library/Fonts/Supplemental/Songti.ttc'  # macOS路径
+]
+
+# 配色方案
+BG_COLOR = (24, 25, 29)  # 深色背景
+CARD_BG = (32, 34, 37)   # 卡片背景色
+STAT_BG = (44, 47, 51)   # 统计框/玩家名背景色
+TEXT_COLOR = (255, 255, 255)  # 主文本色
+SECONDARY_TEXT = (185, 187, 190)  # 次要文本色
+ACCENT_COLOR = (88, 101, 242)  # Discord风格的强调色
+SUCCESS_COLOR = (87, 242, 135)  # 在线状态色
+WARNING_COLOR = (255, 163, 72)  # 警告色
+ERROR_COLOR = (237, 66, 69)     # 错误色
+
+# 服务器卡片布局
+CARD_WIDTH = 700
+CARD_PADDING = 30
+CARD_TEXT_X = CARD_PADDING + ICON_SIZE + 20
+
+# 汇总图布局
+DASHBOARD_PADDING = 24
+DASHBOARD_GAP = 16
+DASHBOARD_HEADER_HEIGHT = 60
+TILE_WIDTH, TILE_HEIGHT = 460, 120
+
+# 单张卡片的玩家列表布局
+PLAYERS_PER_LINE = 3
+DENSE_PLAYERS_PER_LINE = 5
+OVERFLOW_MODES = ("summary", "pages", "columns")
+
+# 玩家数量上限配置，由插件启动时通过 configure_player_overflow 设置
+_max_players = 60
+_overflow_mode = "summary"
+_max_pages = 5
+
+# 静态图层缓存: (类型, 字体, 尺寸...) -> 只读模板图片
+_templates: "OrderedDict[tuple, Image.Image]" = OrderedDict()
+_templates_lock = threading.Lock()
+MAX_TEMPLATES = 64
+
+# 解析后的字体路径，None 表示尚未解析，"" 表示没有可用字体
+_font_path: Optional[str] = None
+# FreeType 字体对象不保证线程安全，每个渲染线程各自缓存 (路径, 字号) -> 字体
+_font_local = threading.local()
+
+
+def configure_font(custom_path: Optional[str] = None) -> str:
+    """
+    解析并固定要使用的字体路径，只需在启动时调用一次
+
+    Args:
+        custom_path: 用户配置的字体路径，优先于内置候选路径
+
+    Returns:
+        选中的字体路径，没有可用字体时返回空字符串(使用PIL默认字体)
+    """
+    global _font_path
+    candidates = ([custom_path] if custom_path else []) + FONT_CANDIDATES
+    _font_path = ""
+    for path in candidates:
+        try:
+            ImageFont.truetype(str(path), 12)
+        except OSError:
+            continue
+        _font_path = str(path)
+        break
+    return _font_path
+
+
+def load_font(font_size):
+    """按字号获取字体，同一线程内的 (路径, 字号) 只解析一次"""
+    if _font_path is None:
+        configure_font()
 
+    cache = _font_local.__dict__.setdefault("fonts", {})
+    key = (_font_path, font_size)
+    font = cache.get(key)
+    if font is None:
+        font = _create_font(_font_path, font_size)
+        cache[key] = font
+    return font
 
-async def load_font(font_size):
-    # 尝试多路径加载
-    font_paths = [
-        Path(__file__).resolve().parent.parent/'resource'/'msyh.ttf',
-        'msyh.ttf',  # 当前目录
-        '/usr/share/fonts/zh_CN/msyh.ttf',  # Linux常见路径
-        'C:/Windows/Fonts/msyh.ttc',  # Windows路径
-        '/System/Library/Fonts/Supplemental/Songti.ttc'  # macOS路径
-    ]
 
-    for path in font_paths:
+def _create_font(path: str, font_size: int):
+    if path:
         try:
             return ImageFont.truetype(path, font_size)
         except OSError:
-            continue
+            pass
 
     # 全部失败时使用默认字体（添加中文支持）
     try:
@@ -29,27 +116,6 @@ async def load_font(font_size):
     except:
         return ImageFont.load_default()
 
-# 在代码中替换字体加载部分
-title_font = load_font(30)
-text_font = load_font(20)
-small_font = load_font(18)
-
-
-async def fetch_icon(icon_base64: Optional[str] = None) -> Optional[Image.Image]:
-    """处理Base64编码的服务器图标"""
-    if not icon_base64:
-        return None
-
-    try:
-        # 去除可能的Base64前缀
-        if "," in icon_base64:
-            icon_base64 = icon_base64.split(",", 1)[1]
-        icon_data = base64.b64decode(icon_base64)
-        return Image.open(io.BytesIO(icon_data)).convert("RGBA")
-    except Exception as e:
-        print(f"Base64图标解码失败: {str(e)}")
-        return None
-
 
 async def generate_server_info_image(
     players_list: list,
@@ -58,28 +124,154 @@ async def generate_server_info_image(
     plays_max: int,
     plays_online: int,
     server_version: str,
-    icon_base64: Optional[str] = None
-) -> str:
-    """生成服务器信息图片并返回base64编码"""
-
-    # 异步获取图标
-    server_icon = await fetch_icon(icon_base64)
-
-    # 配置参数 - 使用更现代的配色方案
-    BG_COLOR = (24, 25, 29)  # 深色背景
-    CARD_BG = (32, 34, 37)   # 卡片背景色
-    TEXT_COLOR = (255, 255, 255)  # 主文本色
-    SECONDARY_TEXT = (185, 187, 190)  # 次要文本色
-    ACCENT_COLOR = (88, 101, 242)  # Discord风格的强调色
-    SUCCESS_COLOR = (87, 242, 135)  # 在线状态色
-    WARNING_COLOR = (255, 163, 72)  # 警告色
-    ERROR_COLOR = (237, 66, 69)     # 错误色
+    icon_base64: Optional[str] = None,
+    updated_text: str = ""
+) -> List[bytes]:
+    """
+    在渲染线程池/进程池中生成服务器信息图片并返回编码后的图片数据列表，输入未变化时复用缓存
+
+    玩家数超过 max_players_per_card 时按 player_overflow 配置处理，
+    分页模式下返回多张图片，其他模式只返回一张。
+    updated_text 非空时(使用后台轮询快照)在卡片上显示数据的更新时间。
+    """
+    pages = split_player_pages(players_list)
+    return list(await asyncio.gather(*[
+        _render_cached(
+            render_server_info_image,
+            players_list=page_players,
+            latency=latency,
+            server_name=server_name if len(pages) == 1 else f"{server_name} ({index}/{len(pages)})",
+            plays_max=plays_max,
+            plays_online=plays_online,
+            server_version=server_version,
+            icon_base64=icon_base64,
+            hidden_players=hidden_players,
+            dense=dense,
+            updated_text=updated_text
+        )
+        for index, (page_players, hidden_players, dense) in enumerate(pages, 1)
+    ]))
+
+
+def configure_player_overflow(max_players: int = 60, mode: str = "summary", max_pages: int = 5) -> None:
+    """
+    配置单张卡片的玩家数量上限和超出时的处理方式
+
+    Args:
+        max_players: 单张卡片最多显示的玩家数，0表示不限制
+        mode: summary(显示"+N"), pages(分为多张图片), columns(更紧凑的多列布局)
+        max_pages: 分页模式下最多的页数，超出部分显示为"+N"
+    """
+    global _max_players, _overflow_mode, _max_pages
+    _max_players = max(0, int(max_players))
+    _overflow_mode = mode if mode in OVERFLOW_MODES else "summary"
+    _max_pages = max(1, int(max_pages))
+
+
+def split_player_pages(players_list: List[str]) -> List[Tuple[List[str], int, bool]]:
+    """
+    按配置拆分玩家列表
+
+    Returns:
+        [(本页玩家, 未显示的玩家数, 是否使用紧凑布局), ...]
+    """
+    limit = _max_players
+    if limit <= 0 or len(players_list) <= limit:
+        return [(players_list, 0, False)]
+
+    if _overflow_mode == "pages":
+        shown = players_list[:limit * _max_pages]
+        pages = [(shown[i:i+limit], 0, False) for i in range(0, len(shown), limit)]
+        last_players, _, _ = pages[-1]
+        pages[-1] = (last_players, len(players_list) - len(shown), False)
+        return pages
+
+    if _overflow_mode == "columns":
+        # 紧凑布局每行显示的玩家更多，按相同行数计算上限
+        limit = limit * DENSE_PLAYERS_PER_LINE // PLAYERS_PER_LINE
+        if len(players_list) <= limit:
+            return [(players_list, 0, True)]
+        return [(players_list[:limit], len(players_list) - limit, True)]
+
+    return [(players_list[:limit], len(players_list) - limit, False)]
+
+
+async def generate_placeholder_image(server_name: str, message: str) -> bytes:
+    """在渲染线程池/进程池中生成紧凑的占位图片并返回编码后的图片数据"""
+    return await _render_cached(render_placeholder_image, server_name=server_name, message=message)
+
+
+async def _render_cached(render_func, **inputs) -> bytes:
+    """先查渲染缓存，未命中时提交到渲染池"""
+    # 编码参数同样属于渲染输入，切换格式后不会命中旧格式的缓存
+    inputs["encoding"] = get_encoding()
+    key = render_cache.make_key(render_func.__name__, **inputs)
+    cached = render_cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = await render_pool.submit(render_func, **inputs)
+    render_cache.put(key, result)
+    return result
+
+
+def render_server_info_image(
+    players_list: list,
+    latency: int,
+    server_name: str,
+    plays_max: int,
+    plays_online: int,
+    server_version: str,
+    icon_base64: Optional[str] = None,
+    hidden_players: int = 0,
+    dense: bool = False,
+    updated_text: str = "",
+    encoding: Optional[Dict[str, Any]] = None
+) -> bytes:
+    """生成服务器信息图片并返回编码后的图片数据(同步执行，应在渲染池中调用)"""
+    with stage_timer("draw"):
+        img = draw_server_info_image(
+            players_list=players_list,
+            latency=latency,
+            server_name=server_name,
+            plays_max=plays_max,
+            plays_online=plays_online,
+            server_version=server_version,
+            icon_base64=icon_base64,
+            hidden_players=hidden_players,
+            dense=dense,
+            updated_text=updated_text
+        )
+    return encode_image(img, encoding)
+
+
+def draw_server_info_image(
+    players_list: list,
+    latency: int,
+    server_name: str,
+    plays_max: int,
+    plays_online: int,
+    server_version: str,
+    icon_base64: Optional[str] = None,
+    hidden_players: int = 0,
+    dense: bool = False,
+    updated_text: str = ""
+) -> Image.Image:
+    """
+    绘制服务器信息图片
+
+    hidden_players 大于0时在列表末尾显示"+N"，dense 为True时使用更紧凑的多列布局，
+    updated_text 非空时显示在统计框右侧
+    """
+
+    # 已解码并缩放好的图标，无图标时为默认图标
+    server_icon = icon_cache.get(icon_base64)
 
     try:
-        title_font = await load_font(32)
-        subtitle_font = await load_font(24)
-        text_font = await load_font(20)
-        small_font = await load_font(16)
+        title_font = load_font(32)
+        subtitle_font = load_font(24)
+        text_font = load_font(20)
+        small_font = load_font(16)
     except IOError:
         title_font = ImageFont.load_default()
         subtitle_font = ImageFont.load_default()
@@ -87,48 +279,39 @@ async def generate_server_info_image(
         small_font = ImageFont.load_default()
 
     # 计算布局参数
-    PADDING = 30
-    icon_size = 80 if server_icon else 0
+    PADDING = CARD_PADDING
     base_y = PADDING
-    text_x = PADDING + icon_size + 20
+    text_x = CARD_TEXT_X
 
     # 计算玩家列表所需的高度
-    player_line_height = 35
-    players_per_line = 3
-    player_lines = (len(players_list) + players_per_line -
-                    1) // players_per_line if players_list else 1
+    if dense:
+        player_font = load_font(14)
+        player_line_height = 28
+        chip_height = 18
+        players_per_line = DENSE_PLAYERS_PER_LINE
+    else:
+        player_font = small_font
+        player_line_height = 35
+        chip_height = 20
+        players_per_line = PLAYERS_PER_LINE
+    # 未显示的玩家以"+N"的形式占用一个位置
+    player_items = list(players_list) + ([f"+{hidden_players}"] if hidden_players > 0 else [])
+    player_lines = (len(player_items) + players_per_line -
+                    1) // players_per_line if player_items else 1
 
     # 基础高度 + 玩家列表高度 + 额外边距
     img_height = 250 + (player_lines * player_line_height) + PADDING
-    img_width = 700  # 增加宽度以适应内容
+    img_width = CARD_WIDTH
 
-    # 创建主画布（使用RGBA模式）
-    img = Image.new("RGBA", (img_width, img_height), color=BG_COLOR + (255,))
+    # 复制预渲染的静态图层(背景、卡片、统计框和固定文字)，只绘制动态内容
+    img = _get_template(
+        ("card", img_width, img_height, bool(players_list)),
+        lambda: _build_card_template(img_width, img_height, bool(players_list))
+    ).copy()
     draw = ImageDraw.Draw(img)
 
-    # 绘制背景卡片
-    draw.rounded_rectangle(
-        [PADDING//2, PADDING//2, img_width-PADDING//2, img_height-PADDING//2],
-        radius=15,
-        fill=CARD_BG + (255,)
-    )
-
     # 绘制服务器图标
-    if server_icon:
-        try:
-            if server_icon.mode != 'RGBA':
-                server_icon = server_icon.convert('RGBA')
-
-            icon_mask = Image.new("L", (icon_size, icon_size), 0)
-            mask_draw = ImageDraw.Draw(icon_mask)
-            mask_draw.rounded_rectangle(
-                (0, 0, icon_size, icon_size), radius=15, fill=255)
-
-            server_icon = server_icon.resize(
-                (icon_size, icon_size), Image.Resampling.LANCZOS)
-            img.paste(server_icon, (PADDING, base_y), mask=icon_mask)
-        except Exception as e:
-            print(f"处理服务器图标时出错: {e}")
+    img.paste(server_icon, (PADDING, base_y), mask=ICON_MASK)
 
     # 服务器名称
     draw.text((text_x, base_y), server_name,
@@ -157,69 +340,476 @@ async def generate_server_info_image(
 
     base_y += 60
 
-    # 玩家统计
-    player_stat_bg = (44, 47, 51)
-    stat_width = (img_width - PADDING * 3) // 2
+    # 在线玩家统计(统计框和标签在模板中)
+    draw.text((text_x+20, base_y+30),
+              f"{plays_online}/{plays_max}", font=text_font, fill=TEXT_COLOR + (255,))
+
+    # 快照更新时间
+    if updated_text:
+        updated_w = draw.textlength(updated_text, font=small_font)
+        draw.text((img_width - PADDING - 10 - updated_w, base_y+35), updated_text,
+                  font=small_font, fill=SECONDARY_TEXT + (255,))
+
+    base_y += 80
+
+    # 玩家列表(标题或"暂无玩家在线"在模板中)
+    if players_list:
+        base_y += 40
+
+        # 先一次性计算所有玩家名的位置和截断结果，再统一绘制
+        max_width = (img_width - text_x - PADDING * 2) // players_per_line
+        layout = layout_player_names(
+            player_items, player_font, text_x + 20, base_y,
+            players_per_line, max_width, player_line_height)
+        for index, (x, y, name_width, display_name) in enumerate(layout):
+            is_summary = hidden_players > 0 and index == len(layout) - 1
+            # 绘制玩家名称背景
+            draw.rounded_rectangle(
+                [x-5, y-2, x+name_width+5, y+chip_height],
+                radius=5,
+                fill=(ACCENT_COLOR if is_summary else STAT_BG) + (255,)
+            )
+            draw.text((x, y), display_name,
+                      font=player_font, fill=TEXT_COLOR + (255,))
+
+    return img
+
+
+def _get_template(key: tuple, builder) -> Image.Image:
+    """获取静态图层模板，不存在时调用 builder 生成；返回的模板只读，使用前需 copy()"""
+    key = (_font_path,) + key
+    with _templates_lock:
+        template = _templates.get(key)
+        if template is not None:
+            _templates.move_to_end(key)
+            return template
+
+    template = builder()
+    with _templates_lock:
+        _templates[key] = template
+        while len(_templates) > MAX_TEMPLATES:
+            _templates.popitem(last=False)
+    return template
+
+
+def _build_card_template(img_width: int, img_height: int, has_players: bool) -> Image.Image:
+    """绘制服务器卡片中与服务器状态无关的部分"""
+    PADDING = CARD_PADDING
+    text_x = CARD_TEXT_X
+    subtitle_font = load_font(24)
+    text_font = load_font(20)
+    small_font = load_font(16)
+
+    img = Image.new("RGBA", (img_width, img_height), color=BG_COLOR + (255,))
+    draw = ImageDraw.Draw(img)
+
+    # 背景卡片
+    draw.rounded_rectangle(
+        [PADDING//2, PADDING//2, img_width-PADDING//2, img_height-PADDING//2],
+        radius=15,
+        fill=CARD_BG + (255,)
+    )
 
     # 在线玩家统计框
+    base_y = PADDING + 50 + 60
+    stat_width = (img_width - PADDING * 3) // 2
     draw.rounded_rectangle(
         [text_x, base_y, text_x+stat_width, base_y+60],
         radius=10,
-        fill=player_stat_bg + (255,)
+        fill=STAT_BG + (255,)
     )
     draw.text((text_x+20, base_y+10), "在线玩家",
               font=small_font, fill=SECONDARY_TEXT + (255,))
-    draw.text((text_x+20, base_y+30),
-              f"{plays_online}/{plays_max}", font=text_font, fill=TEXT_COLOR + (255,))
-
-    base_y += 80
 
     # 玩家列表标题
-    if players_list:
+    base_y += 80
+    if has_players:
         draw.text((text_x, base_y), "在线玩家列表",
                   font=subtitle_font, fill=ACCENT_COLOR + (255,))
-        base_y += 40
-
-        # 玩家列表（每行3个玩家）
-        chunks = [players_list[i:i+players_per_line]
-                  for i in range(0, len(players_list), players_per_line)]
-        max_width = (img_width - text_x - PADDING * 2) // players_per_line
-
-        for chunk in chunks:
-            x = text_x + 20
-            for player in chunk:
-                # 计算玩家名称宽度并确保不超过最大宽度
-                name_width = min(draw.textlength(
-                    player, font=small_font), max_width - 20)
-
-                # 绘制玩家名称背景
-                draw.rounded_rectangle(
-                    [x-5, base_y-2, x+name_width+5, base_y+20],
-                    radius=5,
-                    fill=player_stat_bg + (255,)
-                )
-
-                # 如果名字太长，添加省略号
-                display_name = player
-                if draw.textlength(player, font=small_font) > max_width - 20:
-                    while draw.textlength(display_name + "...", font=small_font) > max_width - 20:
-                        display_name = display_name[:-1]
-                    display_name += "..."
-
-                draw.text((x, base_y), display_name,
-                          font=small_font, fill=TEXT_COLOR + (255,))
-                x += min(name_width + 40, max_width)
-            base_y += player_line_height
     else:
         draw.text((text_x+20, base_y), "暂无玩家在线",
                   font=text_font, fill=SECONDARY_TEXT + (255,))
+    return img
+
+
+def layout_player_names(
+    players_list: List[str],
+    font,
+    start_x: int,
+    start_y: int,
+    players_per_line: int,
+    max_width: int,
+    line_height: int
+) -> List[Tuple[float, float, float, str]]:
+    """
+    计算玩家名列表的布局
+
+    每个名字只测量一次(带缓存)，过长的名字用二分查找截断，整体为线性复杂度。
+
+    Returns:
+        [(x, y, 背景宽度, 显示文本), ...]
+    """
+    layout = []
+    limit = max_width - 20
+    y = start_y
+    for i in range(0, len(players_list), players_per_line):
+        x = start_x
+        for player in players_list[i:i+players_per_line]:
+            # 计算玩家名称宽度并确保不超过最大宽度，太长时添加省略号
+            name_width = min(text_measurer.width(font, player), limit)
+            layout.append((x, y, name_width, text_measurer.truncate(font, player, limit)))
+            x += min(name_width + 40, max_width)
+        y += line_height
+    return layout
+
+
+def render_placeholder_image(server_name: str, message: str,
+                             encoding: Optional[Dict[str, Any]] = None) -> bytes:
+    """生成紧凑的占位图片(如查询超时)并返回编码后的图片数据(同步执行，应在渲染池中调用)"""
+    with stage_timer("draw"):
+        img = draw_placeholder_image(server_name, message)
+    return encode_image(img, encoding)
+
+
+def draw_placeholder_image(server_name: str, message: str) -> Image.Image:
+    """绘制紧凑的占位图片"""
+    title_font = load_font(28)
+    text_font = load_font(20)
+
+    PADDING = CARD_PADDING
+    img_width, img_height = CARD_WIDTH, 110
+
+    img = _get_template(
+        ("placeholder", img_width, img_height),
+        lambda: _build_placeholder_template(img_width, img_height)
+    ).copy()
+    draw = ImageDraw.Draw(img)
+    draw.text((PADDING + 10, PADDING + 8), server_name,
+              font=title_font, fill=TEXT_COLOR)
+
+    # 右侧状态标签
+    message_w = draw.textlength(message, font=text_font)
+    tag_x = img_width - PADDING - message_w - 20
+    draw.rounded_rectangle(
+        [tag_x-10, PADDING + 10, tag_x+message_w+10, PADDING + 42],
+        radius=8,
+        fill=ERROR_COLOR
+    )
+    draw.text((tag_x, PADDING + 13), message,
+              font=text_font, fill=TEXT_COLOR)
+
+    return img
+
 
-    # 在保存之前转换为RGB模式
-    img = img.convert('RGB')
+def _build_placeholder_template(img_width: int, img_height: int) -> Image.Image:
+    PADDING = CARD_PADDING
+    img = Image.new("RGB", (img_width, img_height), color=BG_COLOR)
+    ImageDraw.Draw(img).rounded_rectangle(
+        [PADDING//2, PADDING//2, img_width-PADDING//2, img_height-PADDING//2],
+        radius=15,
+        fill=CARD_BG
+    )
+    return img
+
+
+async def generate_dashboard_image(entries: List[Dict[str, Any]]) -> bytes:
+    """在渲染线程池/进程池中把多个服务器渲染为一张汇总图片并返回编码后的图片数据"""
+    return await _render_cached(render_dashboard_image, entries=entries)
+
+
+def _dashboard_tile_origin(row: int, column: int) -> Tuple[int, int]:
+    """汇总图中第 row 行第 column 列卡片的左上角坐标"""
+    x = DASHBOARD_PADDING + column * (TILE_WIDTH + DASHBOARD_GAP)
+    y = DASHBOARD_PADDING + DASHBOARD_HEADER_HEIGHT + row * (TILE_HEIGHT + DASHBOARD_GAP)
+    return x, y
 
-    # 转换为base64
-    buffer = io.BytesIO()
-    img.save(buffer, format="PNG")
-    img_base64 = base64.b64encode(buffer.getvalue()).decode("utf-8")
 
-    return img_base64
+def _build_dashboard_template(count: int, columns: int) -> Image.Image:
+    """绘制汇总图的背景、标题和所有卡片底板"""
+    PADDING = DASHBOARD_PADDING
+    GAP = DASHBOARD_GAP
+    rows = (count + columns - 1) // columns
+    img_width = PADDING * 2 + columns * TILE_WIDTH + (columns - 1) * GAP
+    img_height = PADDING * 2 + DASHBOARD_HEADER_HEIGHT + rows * TILE_HEIGHT + max(rows - 1, 0) * GAP
+
+    img = Image.new("RGB", (img_width, img_height), color=BG_COLOR)
+    draw = ImageDraw.Draw(img)
+    draw.text((PADDING, PADDING), "服务器状态", font=load_font(30), fill=TEXT_COLOR)
+    for index in range(count):
+        x, y = _dashboard_tile_origin(*divmod(index, columns))
+        draw.rounded_rectangle([x, y, x + TILE_WIDTH, y + TILE_HEIGHT],
+                               radius=12, fill=CARD_BG)
+    return img
+
+
+def dashboard_columns(count: int) -> int:
+    """根据服务器数量决定汇总图的列数"""
+    if count <= 3:
+        return 1
+    if count <= 10:
+        return 2
+    return 3
+
+
+def render_dashboard_image(entries: List[Dict[str, Any]],
+                           encoding: Optional[Dict[str, Any]] = None) -> bytes:
+    """生成多服务器汇总图片并返回编码后的图片数据(同步执行，应在渲染池中调用)"""
+    with stage_timer("draw"):
+        img = draw_dashboard_image(entries)
+    return encode_image(img, encoding)
+
+
+def draw_dashboard_image(entries: List[Dict[str, Any]]) -> Image.Image:
+    """
+    绘制多服务器汇总图片
+
+    每个 entry 包含 server_name 和 state("online"/"offline"/"timeout")，
+    在线服务器还包含 latency、plays_online、plays_max、server_version、icon_base64，
+    来自后台轮询快照的条目还可以包含 updated_text，离线条目包含失败原因 detail。
+    """
+    name_font = load_font(24)
+    text_font = load_font(18)
+    small_font = load_font(16)
+
+    PADDING = DASHBOARD_PADDING
+    columns = dashboard_columns(len(entries))
+    img = _get_template(
+        ("dashboard", len(entries), columns),
+        lambda: _build_dashboard_template(len(entries), columns)
+    ).copy()
+    img_width = img.width
+    draw = ImageDraw.Draw(img)
+
+    # 标题栏(标题在模板中)
+    online_count = sum(1 for entry in entries if entry.get("state") == "online")
+    summary = f"在线 {online_count}/{len(entries)}"
+    summary_w = draw.textlength(summary, font=text_font)
+    draw.text((img_width - PADDING - summary_w, PADDING + 8), summary,
+              font=text_font, fill=SECONDARY_TEXT)
+
+    for index, entry in enumerate(entries):
+        row, column = divmod(index, columns)
+        x, y = _dashboard_tile_origin(row, column)
+
+        icon_y = y + (TILE_HEIGHT - ICON_SIZE) // 2
+        img.paste(icon_cache.get(entry.get("icon_base64")), (x + 20, icon_y), mask=ICON_MASK)
+
+        text_x = x + 20 + ICON_SIZE + 16
+        state = entry.get("state", "offline")
+        if state == "online":
+            latency = entry.get("latency", 0)
+            tag_text = f"{latency}ms"
+            tag_color = SUCCESS_COLOR if latency < 100 else WARNING_COLOR if latency < 200 else ERROR_COLOR
+            tag_text_color = BG_COLOR
+        else:
+            tag_text = "查询超时" if state == "timeout" else "离线"
+            tag_color = ERROR_COLOR
+            tag_text_color = TEXT_COLOR
+
+        # 右上角状态标签
+        tag_w = draw.textlength(tag_text, font=small_font)
+        tag_x = x + TILE_WIDTH - 20 - tag_w
+        draw.rounded_rectangle([tag_x - 8, y + 18, tag_x + tag_w + 8, y + 44],
+                               radius=8, fill=tag_color)
+        draw.text((tag_x, y + 21), tag_text, font=small_font, fill=tag_text_color)
+
+        name_max = tag_x - 16 - text_x
+        draw.text((text_x, y + 16),
+                  text_measurer.truncate(name_font, str(entry.get("server_name", "")), name_max),
+                  font=name_font, fill=TEXT_COLOR)
+
+        if state == "online":
+            info_max = x + TILE_WIDTH - 20 - text_x
+            version = text_measurer.truncate(small_font, f"版本: {entry.get('server_version', '')}", info_max)
+            draw.text((text_x, y + 52), version, font=small_font, fill=SECONDARY_TEXT)
+            draw.text((text_x, y + 78), f"在线玩家 {entry.get('plays_online', 0)}/{entry.get('plays_max', 0)}",
+                      font=text_font, fill=ACCENT_COLOR)
+        elif entry.get("detail"):
+            # 离线原因，熔断中还包括开始时间
+            detail = text_measurer.truncate(small_font, entry["detail"], x + TILE_WIDTH - 20 - text_x)
+            draw.text((text_x, y + 60), detail, font=small_font, fill=SECONDARY_TEXT)
+        else:
+            draw.text((text_x, y + 60), "无法获取服务器信息", font=text_font, fill=SECONDARY_TEXT)
+
+        updated_text = entry.get("updated_text")
+        if updated_text:
+            updated_w = draw.textlength(updated_text, font=small_font)
+            draw.text((x + TILE_WIDTH - 20 - updated_w, y + 84), updated_text,
+                      font=small_font, fill=SECONDARY_TEXT)
+
+    return img
+
+
+# 历史趋势图布局
+HISTORY_WIDTH = 700
+HISTORY_HEADER_HEIGHT = 90
+HISTORY_PANEL_HEIGHT = 150
+HISTORY_PANEL_GAP = 20
+HISTORY_OFFLINE_LATENCY = 0xFFFF  # 与 history.OFFLINE_LATENCY 一致
+
+
+async def generate_history_chart(
+    server_name: str,
+    range_label: str,
+    points: List[Tuple[int, int, int]],
+    start: int,
+    end: int,
+    step: int
+) -> bytes:
+    """在渲染线程池/进程池中生成历史趋势图并返回编码后的图片数据(数据总在变化，不经过渲染缓存)"""
+    return await render_pool.submit(
+        render_history_chart,
+        server_name=server_name,
+        range_label=range_label,
+        points=points,
+        start=start,
+        end=end,
+        step=step,
+        encoding=get_encoding()
+    )
+
+
+def render_history_chart(server_name: str, range_label: str, points: List[Tuple[int, int, int]],
+                         start: int, end: int, step: int,
+                         encoding: Optional[Dict[str, Any]] = None) -> bytes:
+    """生成历史趋势图并返回编码后的图片数据(同步执行，应在渲染池中调用)"""
+    with stage_timer("draw"):
+        img = draw_history_chart(server_name, range_label, points, start, end, step)
+    return encode_image(img, encoding)
+
+
+def draw_history_chart(
+    server_name: str,
+    range_label: str,
+    points: List[Tuple[int, int, int]],
+    start: int,
+    end: int,
+    step: int
+) -> Image.Image:
+    """
+    绘制在线人数和延迟的历史趋势图
+
+    points 为 [(时间戳, 在线人数, 延迟), ...]，离线时延迟为 0xFFFF；
+    相邻两点间隔超过 2 个 step 时视为没有数据，折线断开。
+    """
+    title_font = load_font(28)
+    text_font = load_font(18)
+    small_font = load_font(14)
+
+    PADDING = CARD_PADDING
+    img_width = HISTORY_WIDTH
+    img_height = PADDING * 2 + HISTORY_HEADER_HEIGHT + 2 * HISTORY_PANEL_HEIGHT + HISTORY_PANEL_GAP + 30
+
+    img = Image.new("RGB", (img_width, img_height), color=BG_COLOR)
+    draw = ImageDraw.Draw(img)
+    draw.rounded_rectangle(
+        [PADDING//2, PADDING//2, img_width-PADDING//2, img_height-PADDING//2],
+        radius=15,
+        fill=CARD_BG
+    )
+
+    # 标题和时间范围
+    range_w = draw.textlength(range_label, font=text_font)
+    draw.text((img_width - PADDING - 10 - range_w, PADDING + 8), range_label,
+              font=text_font, fill=SECONDARY_TEXT)
+    title_max = img_width - PADDING * 2 - range_w - 40
+    draw.text((PADDING + 10, PADDING), text_measurer.truncate(title_font, server_name, title_max),
+              font=title_font, fill=TEXT_COLOR)
+
+    if not points:
+        draw.text((PADDING + 10, PADDING + 50), "暂无历史数据", font=text_font, fill=SECONDARY_TEXT)
+        return img
+
+    online_latencies = [latency for _, _, latency in points if latency != HISTORY_OFFLINE_LATENCY]
+    peak = max(online for _, online, _ in points)
+    uptime = len(online_latencies) * 100 / len(points)
+    summary = f"峰值在线 {peak}    可用率 {uptime:.1f}%"
+    if online_latencies:
+        summary += f"    平均延迟 {sum(online_latencies) // len(online_latencies)}ms"
+    draw.text((PADDING + 10, PADDING + 50), summary, font=text_font, fill=SECONDARY_TEXT)
+
+    x0, x1 = PADDING + 10, img_width - PADDING - 10
+    y = PADDING + HISTORY_HEADER_HEIGHT
+    _draw_history_panel(draw, (x0, y, x1, y + HISTORY_PANEL_HEIGHT), "在线人数",
+                        [(ts, online) for ts, online, _ in points], start, end, step,
+                        ACCENT_COLOR, small_font)
+    y += HISTORY_PANEL_HEIGHT + HISTORY_PANEL_GAP
+    _draw_history_panel(draw, (x0, y, x1, y + HISTORY_PANEL_HEIGHT), "延迟(ms)",
+                        [(ts, latency) for ts, _, latency in points], start, end, step,
+                        SUCCESS_COLOR, small_font, offline_value=HISTORY_OFFLINE_LATENCY)
+    y += HISTORY_PANEL_HEIGHT + 6
+
+    # 时间轴起止
+    time_format = "%m-%d %H:%M"
+    start_text = time.strftime(time_format, time.localtime(start))
+    end_text = time.strftime(time_format, time.localtime(end))
+    draw.text((x0, y), start_text, font=small_font, fill=SECONDARY_TEXT)
+    draw.text((x1 - draw.textlength(end_text, font=small_font), y), end_text,
+              font=small_font, fill=SECONDARY_TEXT)
+    return img
+
+
+def _draw_history_panel(draw, box: Tuple[int, int, int, int], label: str,
+                        values: List[Tuple[int, int]], start: int, end: int, step: int,
+                        color: Tuple[int, int, int], font, offline_value: Optional[int] = None) -> None:
+    """在 box 内绘制一条折线；值为 offline_value 的点在底部标记为离线"""
+    x0, y0, x1, y1 = box
+    draw.rounded_rectangle([x0, y0, x1, y1], radius=10, fill=STAT_BG)
+    draw.text((x0 + 12, y0 + 8), label, font=font, fill=SECONDARY_TEXT)
+
+    plot_x0, plot_x1 = x0 + 12, x1 - 12
+    plot_y0, plot_y1 = y0 + 32, y1 - 14
+    plot_w = plot_x1 - plot_x0
+    span = max(end - start, 1)
+
+    # 按像素列聚合: 列 -> [最早时间, 最晚时间, 最大值(在线人数)/总和(延迟), 数量, 是否有离线]
+    columns: Dict[int, List[int]] = {}
+    for ts, value in values:
+        column = min(max(int((ts - start) * plot_w / span), 0), plot_w)
+        entry = columns.setdefault(column, [ts, ts, 0, 0, 0])
+        entry[0] = min(entry[0], ts)
+        entry[1] = max(entry[1], ts)
+        if offline_value is not None and value == offline_value:
+            entry[4] = 1
+            continue
+        if offline_value is None:
+            entry[2] = max(entry[2], value)
+            entry[3] = 1
+        else:
+            entry[2] += value
+            entry[3] += 1
+
+    series = []
+    for column in sorted(columns):
+        first_ts, last_ts, total, count, offline = columns[column]
+        if offline:
+            draw.line([plot_x0 + column, plot_y1 + 4, plot_x0 + column, plot_y1 + 10], fill=ERROR_COLOR)
+        if count:
+            series.append((column, first_ts, last_ts, total / count if offline_value is not None else total))
+
+    top = max([value for *_, value in series] + [1])
+    top_text = f"最高 {int(top)}"
+    draw.text((x1 - 12 - draw.textlength(top_text, font=font), y0 + 8), top_text,
+              font=font, fill=SECONDARY_TEXT)
+    draw.line([plot_x0, (plot_y0 + plot_y1) // 2, plot_x1, (plot_y0 + plot_y1) // 2], fill=CARD_BG)
+
+    def to_xy(column: int, value: float) -> Tuple[float, float]:
+        return plot_x0 + column, plot_y1 - value * (plot_y1 - plot_y0) / top
+
+    segment: List[Tuple[float, float]] = []
+    previous_ts = None
+    for column, first_ts, last_ts, value in series:
+        if previous_ts is not None and first_ts - previous_ts > step * 2:
+            _draw_segment(draw, segment, color)
+            segment = []
+        segment.append(to_xy(column, value))
+        previous_ts = last_ts
+    _draw_segment(draw, segment, color)
+
+
+def _draw_segment(draw, segment: List[Tuple[float, float]], color: Tuple[int, int, int]) -> None:
+    if len(segment) > 1:
+        draw.line(segment, fill=color, width=2)
+    elif segment:
+        x, y = segment[0]
+        draw.ellipse([x - 2, y - 2, x + 2, y + 2], fill=color)
@@ -1,61 +1,123 @@
 import asyncio
-import aiohttp
 from mcstatus import JavaServer
 import socket
-import base64
-from pathlib import Path
 import re
 from astrbot.api import logger
+from .status_cache import status_cache
+from .dns_cache import resolver_cache
+from .query_backoff import query_backoff
+from .history import history_store
+from .circuit_breaker import circuit_breaker
+from .slp import SLPStatus, slp_client
+from .metrics import metrics
+from .player_providers import player_list_client
 
 csu_host = 'csu-mc.org'
 csu_get_players = 'https://map.magicalsheep.cn/tiles/players.json'
 
+STATUS_CLIENTS = ("native", "mcstatus")
+# status 返回后最多再等待 query 的时间(秒)；实际等待时间至少为两倍延迟
+QUERY_GRACE = 0.5
+# 状态查询客户端，由插件启动时通过 configure_status_client 设置
+_status_client = "native"
 
-async def get_server_status(host):
+
+def configure_status_client(client: str = "native") -> None:
+    """
+    选择状态查询客户端
+
+    :param client: native(内置SLP客户端，按已解析的IP连接、单连接完成状态和ping) 或 mcstatus
+    """
+    global _status_client
+    _status_client = client if client in STATUS_CLIENTS else "native"
+
+
+async def get_server_status(host, use_cache: bool = True):
+    """
+    获取服务器状态，默认经过进程级状态缓存
+
+    :param host: 服务器地址
+    :param use_cache: 是否使用缓存(同一主机的并发请求始终会被合并)
+    :return: 服务器状态字典，失败或熔断中时返回None
+    """
+    # 熔断中的离线服务器直接返回，不再等待DNS解析和连接超时；
+    # 是否恢复由熔断器在后台发起的单次探测决定
+    if not circuit_breaker.allow(host, lambda: status_cache.get(host, fetch_and_record)):
+        # 熔断期间同样记为离线，否则趋势图上是空白
+        history_store.record_offline(host)
+        return None
+    if not use_cache:
+        status_cache.invalidate(host)
+    return await status_cache.get(host, fetch_and_record)
+
+
+async def fetch_and_record(host):
+    """查询服务器状态并记录到历史(只记录实际查询，缓存命中不重复记录)"""
+    info = await metrics.timed("fetch", fetch_server_status(host), host)
+    history_store.record(host, info)
+    return info
+
+
+async def fetch_server_status(host):
+    """不经过缓存，直接查询服务器状态"""
     try:
-        # 调用mcstatus获取服务器信息
-        server = await JavaServer.async_lookup(host)
-        # 使用异步方法查询服务器状态
-        status = await server.async_status()
+        # 通过解析缓存获取SRV目标和端口，避免每次查询都重新解析
+        resolved = await metrics.timed("dns", resolver_cache.resolve(host), host)
+        # 握手需要使用主机名(虚拟主机/转发依赖它)，连接和query只需要IP
+        # query 使用与状态查询相同的超时，而不是 mcstatus 默认的3秒
+        query_server = JavaServer(resolved.ip, resolved.port, timeout=slp_client.timeout)
+
+        # status 和 query 并行进行；已知未开启query的服务器在退避期内跳过query
+        query_task = None
+        if query_backoff.should_query(host):
+            query_task = asyncio.ensure_future(
+                metrics.timed("query", query_server.async_query(tries=1), host))
+        try:
+            status = await metrics.timed(
+                "status", query_status(resolved.host, resolved.ip, resolved.port), host)
+        except BaseException:
+            if query_task is not None:
+                _discard_task(query_task)
+            raise
         players_list = []
         latency = int(status.latency)
-        plays_max = status.players.max
-        plays_online = status.players.online
-        server_version = status.version.name
-
-        # 保存服务器图标
-        if status.icon:
-            icon_data = status.icon.split(",")[1]
-        else:
-            image_path = Path(__file__).resolve().parent.parent / \
-                'resource' / 'default_icon.png'
-            with open(image_path, 'rb') as image_file:
-                # 读取图片文件内容
-                image_data = image_file.read()
-                # 对图片数据进行 Base64 编码
-                base64_encoded = base64.b64encode(image_data)
-            # 将编码后的字节数据转换为字符串
-            icon_data = base64_encoded.decode('utf-8')
+        plays_max = status.players_max
+        plays_online = status.players_online
+        server_version = status.version_name
+
+        # 保存服务器图标，没有图标时由渲染端使用预加载的默认图标
+        icon_data = status.icon.split(",")[1] if status.icon else None
 
         logger.debug(f"服务器status: {status}")
 
         # 尝试使用query获取完整的玩家列表
-        try:
-            query = await server.async_query()
-            if query.players.names:
-                players_list = query.players.names
-            elif status.players.sample:  # 如果query失败，尝试使用status中的sample
-                for player in status.players.sample:
-                    players_list.append(player.name)
-        except Exception as e:
-            logger.warning(f"使用query获取玩家列表失败: {e}")
-            # 如果query失败，仍然尝试使用status中的sample
-            if status.players.sample:
-                for player in status.players.sample:
-                    players_list.append(player.name)
+        if query_task is not None:
+            # 与 status 并行的 query 通常已经完成；未开启query的服务器不会响应，
+            # 只再等待很短的时间，不让它拖慢整个查询
+            grace = min(max(QUERY_GRACE, latency * 2 / 1000), slp_client.timeout)
+            try:
+                query = await asyncio.wait_for(query_task, timeout=grace)
+            except (asyncio.TimeoutError, OSError) as e:
+                # 只有超时/连接错误说明服务器未开启query，进入退避
+                query_backoff.record_failure(host)
+                logger.debug(f"使用query获取玩家列表失败: {e}")
+            except Exception as e:
+                logger.warning(f"解析 {host} 的query响应失败: {e}")
+            else:
+                query_backoff.record_success(host)
+                # 新版 mcstatus 为 players.list，旧版为 players.names
+                names = getattr(query.players, "list", None)
+                if names is None:
+                    names = query.players.names
+                players_list = list(names)
+
+        # 如果query失败或未开启，尝试使用status中的sample
+        if not players_list and status.sample:
+            players_list.extend(status.sample)
 
         # 对玩家列表进行字母顺序排序
         players_list.sort()
+        circuit_breaker.record_success(host)
 
         return {
             "players_list": players_list,  # 玩家昵称列表
@@ -63,20 +125,47 @@ async def get_server_status(host):
             "plays_max": plays_max,  # 最大玩家数
             "plays_online": plays_online,  # 在线玩家数
             "server_version": server_version,  # 服务器游戏版本
-            "icon_base64": icon_data,  # 服务器图标base64
+            "icon_base64": icon_data,  # 服务器图标base64，无图标时为None
         }
 
-    except (socket.gaierror, ConnectionRefusedError) as e:
+    except socket.gaierror as e:
+        logger.error(f"连接服务器失败: {e}")
+        circuit_breaker.record_failure(host, "dns")
+        return None
+    except ConnectionRefusedError as e:
         logger.error(f"连接服务器失败: {e}")
+        circuit_breaker.record_failure(host, "refused")
         return None
     except asyncio.TimeoutError:
         logger.error(f"获取服务器状态超时")
+        circuit_breaker.record_failure(host, "timeout")
         return None
     except Exception as e:
         logger.error(f"获取服务器状态时发生未知错误: {e}")
+        circuit_breaker.record_failure(host, "error")
         return None
 
 
+async def query_status(host: str, ip: str, port: int) -> SLPStatus:
+    """
+    使用配置的客户端查询服务器状态
+
+    :param host: 握手中发送的主机名
+    :param ip: 已解析的IP
+    :param port: 端口
+    :return: 服务器状态
+    """
+    if _status_client == "native":
+        return await slp_client.status(host, port, connect_host=ip)
+    return SLPStatus.from_mcstatus(await JavaServer(host, port).async_status())
+
+
+def _discard_task(task: asyncio.Task) -> None:
+    """取消不再需要的任务，并吞掉其异常避免未检索异常的警告"""
+    task.cancel()
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+
 async def main():
     host = "csu-mc.org"  # 请替换为实际的服务器地址
     result = await get_server_status(host)
@@ -91,28 +180,19 @@ async def fetch_players_names(url: str) -> list[str]:
     """
     异步获取并解析玩家名称列表并且屏蔽bot_开头的玩家名称
 
+    通过共享的玩家列表客户端请求(连接复用、条件请求和短时缓存)
+
     :param url: 数据接口URL
     :return: 玩家名称列表
     """
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            # 检查响应状态码
-            if response.status != 200:
-                raise ValueError(f"请求失败，状态码: {response.status}")
-
-            # 解析JSON数据
-            data = await response.json()
-
-            # 提取所有name字段
-            names = [player["name"] for player in data.get("players", [])]
-
-            # 使用正则表达式过滤掉以 'bot_' 开头的名称
-            pattern = re.compile(r'^bot_')
+    names = await player_list_client.fetch("squaremap", url)
+    if names is None:
+        raise ValueError(f"获取玩家列表失败: {url}")
 
-            filtered_names = [
-                name for name in names if not pattern.match(name)]
+    # 使用正则表达式过滤掉以 'bot_' 开头的名称
+    pattern = re.compile(r'^bot_')
 
-            return filtered_names
+    return [name for name in names if not pattern.match(name)]
 
 
 if __name__ == "__main__":
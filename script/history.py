@@ -0,0 +1,439 @@
+import asyncio
+import hashlib
+import os
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from astrbot.api import logger
+
+# 离线时延迟字段使用的哨兵值
+OFFLINE_LATENCY = 0xFFFF
+MAX_ONLINE = 0xFFFE
+
+MAGIC = b"MCH1"
+_HEADER = struct.Struct("<H")      # 地址长度
+_SERIES = struct.Struct("<II")     # 容量, 点数
+_BUCKET = struct.Struct("<BIHdI")  # 是否存在, 起始时间, 最高在线, 延迟总和, 延迟采样数
+
+# (时间桶长度(秒), 名称)
+TIERS = ((60, "1m"), (3600, "1h"))
+
+Point = Tuple[int, int, int]  # (时间戳, 在线人数, 延迟)
+
+
+def _to_le(arr: array) -> bytes:
+    if sys.byteorder == "big":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _from_le(typecode: str, data: bytes) -> array:
+    arr = array(typecode)
+    arr.frombytes(data)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+
+class RingSeries:
+    """
+    固定容量的环形时间序列
+
+    每个点占 8 字节: 时间戳(uint32)、在线人数(uint16)、延迟(uint16)，
+    写满后覆盖最旧的点。
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, int(capacity))
+        self.timestamps = array("I", bytes(4 * self.capacity))
+        self.online = array("H", bytes(2 * self.capacity))
+        self.latency = array("H", bytes(2 * self.capacity))
+        self.start = 0
+        self.size = 0
+
+    def append(self, timestamp: int, online: int, latency: int) -> None:
+        index = (self.start + self.size) % self.capacity
+        self.timestamps[index] = timestamp
+        self.online[index] = online
+        self.latency[index] = latency
+        if self.size < self.capacity:
+            self.size += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+
+    def last_timestamp(self) -> int:
+        if not self.size:
+            return 0
+        return self.timestamps[(self.start + self.size - 1) % self.capacity]
+
+    def points(self, since: int = 0) -> List[Point]:
+        """按时间顺序返回 since 之后的点"""
+        result = []
+        for offset in range(self.size):
+            index = (self.start + offset) % self.capacity
+            timestamp = self.timestamps[index]
+            if timestamp >= since:
+                result.append((timestamp, self.online[index], self.latency[index]))
+        return result
+
+    def _ordered(self, arr: array) -> array:
+        end = self.start + self.size
+        if end <= self.capacity:
+            return arr[self.start:end]
+        return arr[self.start:] + arr[:end - self.capacity]
+
+    def to_bytes(self) -> bytes:
+        return b"".join((
+            _SERIES.pack(self.capacity, self.size),
+            _to_le(self._ordered(self.timestamps)),
+            _to_le(self._ordered(self.online)),
+            _to_le(self._ordered(self.latency)),
+        ))
+
+    @classmethod
+    def from_bytes(cls, data: memoryview, offset: int, capacity: int) -> Tuple["RingSeries", int]:
+        """从文件内容恢复，容量变化时只保留最新的点"""
+        _, size = _SERIES.unpack_from(data, offset)
+        offset += _SERIES.size
+        columns = []
+        for typecode, width in (("I", 4), ("H", 2), ("H", 2)):
+            columns.append(_from_le(typecode, bytes(data[offset:offset + size * width])))
+            offset += size * width
+
+        series = cls(capacity)
+        for timestamp, online, latency in zip(*(column[-series.capacity:] for column in columns)):
+            series.append(timestamp, online, latency)
+        return series, offset
+
+
+class _Bucket:
+    """正在累积的时间桶: 记录最高在线人数和在线时的平均延迟"""
+
+    __slots__ = ("start", "online_max", "latency_sum", "latency_count")
+
+    def __init__(self, start: int):
+        self.start = start
+        self.online_max = 0
+        self.latency_sum = 0.0
+        self.latency_count = 0
+
+    def add(self, online: int, latency: Optional[float]) -> None:
+        self.online_max = max(self.online_max, min(online, MAX_ONLINE))
+        if latency is not None:
+            self.latency_sum += latency
+            self.latency_count += 1
+
+    def point(self) -> Point:
+        if self.latency_count:
+            latency = min(int(round(self.latency_sum / self.latency_count)), OFFLINE_LATENCY - 1)
+        else:
+            latency = OFFLINE_LATENCY
+        return self.start, self.online_max, latency
+
+    def to_bytes(self) -> bytes:
+        return _BUCKET.pack(1, self.start, self.online_max, self.latency_sum, self.latency_count)
+
+    @classmethod
+    def from_bytes(cls, data: memoryview, offset: int) -> Tuple[Optional["_Bucket"], int]:
+        present, start, online_max, latency_sum, latency_count = _BUCKET.unpack_from(data, offset)
+        offset += _BUCKET.size
+        if not present:
+            return None, offset
+        bucket = cls(start)
+        bucket.online_max = online_max
+        bucket.latency_sum = latency_sum
+        bucket.latency_count = latency_count
+        return bucket, offset
+
+
+_EMPTY_BUCKET = _BUCKET.pack(0, 0, 0, 0.0, 0)
+
+
+class HostHistory:
+    """单个地址的历史记录，分为 1 分钟和 1 小时两级"""
+
+    def __init__(self, host: str, capacities: Tuple[int, int]):
+        self.host = host
+        self.series = [RingSeries(capacity) for capacity in capacities]
+        self.buckets: List[Optional[_Bucket]] = [None] * len(TIERS)
+        self.last_seen = 0
+
+    def record(self, timestamp: int, online: int, latency: Optional[float]) -> None:
+        self.last_seen = max(self.last_seen, timestamp)
+        self._add(0, timestamp, online, latency)
+
+    def _add(self, tier: int, timestamp: int, online: int, latency: Optional[float]) -> None:
+        step = TIERS[tier][0]
+        start = timestamp - timestamp % step
+        bucket = self.buckets[tier]
+        if bucket is not None and bucket.start != start:
+            if start < bucket.start:
+                return  # 乱序的旧采样直接丢弃
+            self._close(tier, bucket)
+            bucket = None
+        if bucket is None:
+            bucket = self.buckets[tier] = _Bucket(start)
+        bucket.add(online, latency)
+
+    def _close(self, tier: int, bucket: _Bucket) -> None:
+        """时间桶结束，写入环形序列并汇总到下一级"""
+        _, online, latency = point = bucket.point()
+        self.series[tier].append(*point)
+        if tier + 1 < len(TIERS):
+            self._add(tier + 1, bucket.start, online,
+                      None if latency == OFFLINE_LATENCY else latency)
+
+    def has_bucket(self, timestamp: int) -> bool:
+        """最细一级中 timestamp 所在的时间桶是否已有采样"""
+        bucket = self.buckets[0]
+        return bucket is not None and bucket.start == timestamp - timestamp % TIERS[0][0]
+
+    def points(self, tier: int, since: int) -> List[Point]:
+        """返回某一级 since 之后的点，包括尚未结束的时间桶"""
+        result = self.series[tier].points(since)
+        bucket = self.buckets[tier]
+        if bucket is not None and bucket.start >= since:
+            result.append(bucket.point())
+        return result
+
+    def to_bytes(self) -> bytes:
+        host = self.host.encode("utf-8")
+        parts = [MAGIC, _HEADER.pack(len(host)), host]
+        for series, bucket in zip(self.series, self.buckets):
+            parts.append(series.to_bytes())
+            parts.append(bucket.to_bytes() if bucket is not None else _EMPTY_BUCKET)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, capacities: Tuple[int, int]) -> "HostHistory":
+        view = memoryview(data)
+        if bytes(view[:4]) != MAGIC:
+            raise ValueError("不是有效的历史记录文件")
+        (length,) = _HEADER.unpack_from(view, 4)
+        offset = 4 + _HEADER.size
+        history = cls(bytes(view[offset:offset + length]).decode("utf-8"), capacities)
+        offset += length
+        for tier, capacity in enumerate(capacities):
+            history.series[tier], offset = RingSeries.from_bytes(view, offset, capacity)
+            history.buckets[tier], offset = _Bucket.from_bytes(view, offset)
+        history.last_seen = max(
+            [series.last_timestamp() for series in history.series] +
+            [bucket.start for bucket in history.buckets if bucket is not None]
+        )
+        return history
+
+
+class HistoryStore:
+    """
+    所有服务器的在线人数/延迟历史
+
+    每次实际查询的结果按 1 分钟聚合(最高在线人数、平均延迟)，
+    再汇总为 1 小时级别；每级都是固定容量的环形数组，
+    单个地址最多占用 (minute_capacity + hour_capacity) * 8 字节。
+    定期把有变化的地址以紧凑的二进制格式原子写入 data_dir/{地址哈希}.bin。
+    """
+
+    def __init__(self, minute_capacity: int = 48 * 60, hour_capacity: int = 90 * 24,
+                 max_hosts: int = 500, save_interval: float = 300.0):
+        self.enabled = False
+        self.data_dir: Optional[Path] = None
+        self.minute_capacity = minute_capacity
+        self.hour_capacity = hour_capacity
+        self.max_hosts = max_hosts
+        self.save_interval = save_interval
+        self._hosts: Dict[str, HostHistory] = {}
+        self._dirty: set = set()
+        self._removed: set = set()
+        self._save_task: Optional[asyncio.Task] = None
+
+    def configure(
+        self,
+        data_dir: Optional[Path] = None,
+        enabled: bool = True,
+        minute_hours: Optional[float] = None,
+        hour_days: Optional[float] = None,
+        max_hosts: Optional[int] = None,
+        save_interval: Optional[float] = None
+    ) -> None:
+        """
+        更新历史记录参数
+
+        Args:
+            data_dir: 历史记录文件目录，为None时只保存在内存中
+            enabled: 是否记录历史
+            minute_hours: 1 分钟级别保留的小时数
+            hour_days: 1 小时级别保留的天数
+            max_hosts: 最多记录的地址数，超出时丢弃最久未更新的地址
+            save_interval: 写回磁盘的间隔(秒)
+        """
+        self.enabled = enabled
+        if data_dir is not None:
+            self.data_dir = Path(data_dir)
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+        if minute_hours is not None:
+            self.minute_capacity = max(1, int(float(minute_hours) * 60))
+        if hour_days is not None:
+            self.hour_capacity = max(1, int(float(hour_days) * 24))
+        if max_hosts is not None:
+            self.max_hosts = max(1, int(max_hosts))
+        if save_interval is not None:
+            self.save_interval = max(1.0, float(save_interval))
+
+    @property
+    def capacities(self) -> Tuple[int, int]:
+        return self.minute_capacity, self.hour_capacity
+
+    @staticmethod
+    def _key(host: str) -> str:
+        return host.strip().lower()
+
+    def _file_path(self, key: str) -> Path:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
+        return self.data_dir / f"{digest}.bin"
+
+    def record(self, host: str, info: Optional[Dict[str, Any]], timestamp: Optional[float] = None) -> None:
+        """
+        记录一次查询结果
+
+        Args:
+            host: 服务器地址
+            info: get_server_status 的结果，None 表示离线
+            timestamp: 采样时间，默认为当前时间
+        """
+        if not self.enabled:
+            return
+        key = self._key(host)
+        history = self._hosts.get(key)
+        created = history is None
+        if created:
+            history = self._hosts[key] = HostHistory(key, self.capacities)
+            self._removed.discard(key)
+        if info is None:
+            history.record(int(timestamp or time.time()), 0, None)
+        else:
+            history.record(int(timestamp or time.time()),
+                           int(info.get('plays_online') or 0), info.get('latency'))
+        self._dirty.add(key)
+        if created:
+            self._evict()
+
+    def record_offline(self, host: str, timestamp: Optional[float] = None) -> None:
+        """
+        记录熔断期间的离线(没有实际查询)，每个时间桶最多记录一次
+
+        熔断中的查询直接返回，不记录的话这段时间在趋势图上是空白而不是离线，可用率会偏高
+
+        Args:
+            host: 服务器地址
+            timestamp: 采样时间，默认为当前时间
+        """
+        if not self.enabled:
+            return
+        timestamp = int(timestamp or time.time())
+        history = self._hosts.get(self._key(host))
+        if history is not None and history.has_bucket(timestamp):
+            return
+        self.record(host, None, timestamp)
+
+    def _evict(self) -> None:
+        while len(self._hosts) > self.max_hosts:
+            key = min(self._hosts, key=lambda k: self._hosts[k].last_seen)
+            del self._hosts[key]
+            self._dirty.discard(key)
+            self._removed.add(key)
+
+    def query(self, host: str, span: float) -> Tuple[int, List[Point]]:
+        """
+        获取最近 span 秒的历史，自动选择能覆盖该范围的最细级别
+
+        Returns:
+            (时间桶长度(秒), [(时间戳, 在线人数, 延迟), ...])，离线时延迟为 OFFLINE_LATENCY
+        """
+        since = int(time.time() - span)
+        tier = 0 if span <= self.minute_capacity * TIERS[0][0] else 1
+        history = self._hosts.get(self._key(host))
+        if history is None:
+            return TIERS[tier][0], []
+        return TIERS[tier][0], history.points(tier, since)
+
+    async def start(self) -> None:
+        """从磁盘加载历史记录并开始定期写回"""
+        if not self.enabled or self.data_dir is None:
+            return
+        loop = asyncio.get_running_loop()
+        loaded = await loop.run_in_executor(None, self._load_all)
+        for history in loaded:
+            self._hosts.setdefault(history.host, history)
+        self._evict()
+        logger.info(f"已加载 {len(loaded)} 个服务器的历史记录")
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.ensure_future(self._save_loop())
+
+    def _load_all(self) -> List[HostHistory]:
+        loaded = []
+        for path in self.data_dir.glob("*.bin"):
+            try:
+                loaded.append(HostHistory.from_bytes(path.read_bytes(), self.capacities))
+            except (OSError, ValueError, struct.error, UnicodeDecodeError) as e:
+                logger.error(f"读取历史记录 {path} 失败: {e}")
+        return loaded
+
+    async def _save_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.save_interval)
+            try:
+                await self.save()
+            except Exception as e:
+                logger.error(f"写回历史记录失败: {e}")
+
+    async def save(self) -> None:
+        """把有变化的地址写回磁盘，并删除已淘汰地址的文件"""
+        if self.data_dir is None:
+            return
+        # 序列化在事件循环中完成(只是数组拷贝)，文件写入放到线程池
+        pending = {key: self._hosts[key].to_bytes() for key in self._dirty if key in self._hosts}
+        removed = set(self._removed)
+        self._dirty.clear()
+        self._removed.clear()
+        if pending or removed:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._write_files, pending, removed)
+
+    def _write_files(self, pending: Dict[str, bytes], removed: set) -> None:
+        for key, data in pending.items():
+            path = self._file_path(key)
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        for key in removed:
+            try:
+                os.remove(self._file_path(key))
+            except FileNotFoundError:
+                pass
+
+    async def close(self) -> None:
+        """停止定期写回并立即写回"""
+        if self._save_task is not None:
+            self._save_task.cancel()
+            await asyncio.gather(self._save_task, return_exceptions=True)
+            self._save_task = None
+        if self.enabled:
+            await self.save()
+
+    def stats(self) -> Dict[str, int]:
+        """返回历史记录统计信息"""
+        return {
+            "hosts": len(self._hosts),
+            "dirty": len(self._dirty),
+            "bytes_per_host": (self.minute_capacity + self.hour_capacity) * 8,
+        }
+
+
+# 进程级共享实例
+history_store = HistoryStore()
@@ -0,0 +1,102 @@
+import base64
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image, ImageDraw
+
+from astrbot.api import logger
+
+ICON_SIZE = 80
+ICON_RADIUS = 15
+DEFAULT_ICON_PATH = Path(__file__).resolve().parent.parent / 'resource' / 'default_icon.png'
+
+
+def _build_icon_mask(size: int, radius: int) -> Image.Image:
+    mask = Image.new("L", (size, size), 0)
+    ImageDraw.Draw(mask).rounded_rectangle((0, 0, size, size), radius=radius, fill=255)
+    return mask
+
+
+def _prepare_icon(image: Image.Image) -> Image.Image:
+    """转换为RGBA并缩放到卡片尺寸，总是返回新的图像对象"""
+    image = image.convert("RGBA")
+    if image.size != (ICON_SIZE, ICON_SIZE):
+        image = image.resize((ICON_SIZE, ICON_SIZE), Image.Resampling.LANCZOS)
+    return image
+
+
+def _load_default_icon() -> Image.Image:
+    try:
+        with Image.open(DEFAULT_ICON_PATH) as image:
+            return _prepare_icon(image)
+    except OSError as e:
+        logger.warning(f"加载默认图标失败: {e}")
+        return Image.new("RGBA", (ICON_SIZE, ICON_SIZE), (88, 101, 242, 255))
+
+
+# 模块加载时准备一次，所有卡片共用(只读使用)
+ICON_MASK = _build_icon_mask(ICON_SIZE, ICON_RADIUS)
+DEFAULT_ICON = _load_default_icon()
+
+
+class IconCache:
+    """
+    服务器图标缓存
+
+    以图标 base64 内容的哈希为键，保存已解码、已缩放到 80x80 的 RGBA 图标，
+    同一图标只解码和缩放一次。无图标或解码失败时返回预加载的默认图标。
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, Image.Image]" = OrderedDict()
+        # 渲染在线程池中并发执行
+        self._lock = threading.Lock()
+
+    def get(self, icon_base64: Optional[str]) -> Image.Image:
+        """
+        获取可直接粘贴的图标
+
+        Args:
+            icon_base64: 服务器图标的base64编码(可带 data URI 前缀)
+
+        Returns:
+            80x80 的 RGBA 图标，调用方不应修改它
+        """
+        if not icon_base64:
+            return DEFAULT_ICON
+
+        key = hashlib.blake2b(icon_base64.encode("ascii", "ignore"), digest_size=16).digest()
+        with self._lock:
+            icon = self._entries.get(key)
+            if icon is not None:
+                self._entries.move_to_end(key)
+                return icon
+
+        icon = self._decode(icon_base64)
+        with self._lock:
+            self._entries[key] = icon
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return icon
+
+    @staticmethod
+    def _decode(icon_base64: str) -> Image.Image:
+        try:
+            # 去除可能的Base64前缀
+            if "," in icon_base64:
+                icon_base64 = icon_base64.split(",", 1)[1]
+            icon_data = base64.b64decode(icon_base64)
+            with Image.open(io.BytesIO(icon_data)) as image:
+                return _prepare_icon(image)
+        except Exception as e:
+            logger.warning(f"Base64图标解码失败: {e}")
+            return DEFAULT_ICON
+
+
+# 进程级共享实例
+icon_cache = IconCache()
@@ -0,0 +1,86 @@
+import io
+from typing import Any, Dict, Optional
+
+from PIL import Image
+
+from astrbot.api import logger
+from .metrics import stage_timer
+
+# 支持的输出格式
+FORMATS = ("png", "png_palette", "webp", "webp_lossless", "jpeg")
+
+DEFAULT_ENCODING: Dict[str, Any] = {
+    "format": "png",
+    "quality": 85,  # jpeg/webp 质量
+    "compress_level": 6,  # png zlib 压缩等级 0-9
+    "optimize": False,  # png/jpeg 额外的优化压缩，更小但更慢
+    "palette_colors": 256,  # png_palette 的调色板颜色数
+}
+
+# 当前生效的编码参数，由插件启动时配置
+_encoding: Dict[str, Any] = dict(DEFAULT_ENCODING)
+
+
+def configure_encoding(**options: Any) -> Dict[str, Any]:
+    """
+    更新图片编码参数，未知格式回退为png
+
+    Returns:
+        生效的编码参数
+    """
+    global _encoding
+    encoding = dict(DEFAULT_ENCODING)
+    encoding.update({k: v for k, v in options.items() if v is not None})
+    if encoding["format"] not in FORMATS:
+        logger.warning(f"未知的图片格式 {encoding['format']}，使用 png")
+        encoding["format"] = "png"
+    encoding["quality"] = min(max(int(encoding["quality"]), 1), 100)
+    encoding["compress_level"] = min(max(int(encoding["compress_level"]), 0), 9)
+    encoding["palette_colors"] = min(max(int(encoding["palette_colors"]), 2), 256)
+    encoding["optimize"] = bool(encoding["optimize"])
+    _encoding = encoding
+    return dict(_encoding)
+
+
+def get_encoding() -> Dict[str, Any]:
+    """获取当前编码参数的副本"""
+    return dict(_encoding)
+
+
+def encode_image(img: Image.Image, encoding: Optional[Dict[str, Any]] = None) -> bytes:
+    """
+    按编码参数把图片编码为字节
+
+    Args:
+        img: RGB 或 RGBA 图片
+        encoding: 编码参数，None 时使用当前配置
+
+    Returns:
+        编码后的图片数据
+    """
+    encoding = encoding or _encoding
+    fmt = encoding.get("format", "png")
+    buffer = io.BytesIO()
+
+    with stage_timer("encode"):
+        _save(img, buffer, fmt, encoding)
+        return buffer.getvalue()
+
+
+def _save(img: Image.Image, buffer: io.BytesIO, fmt: str, encoding: Dict[str, Any]) -> None:
+    if fmt == "jpeg":
+        img.convert("RGB").save(buffer, format="JPEG", quality=encoding["quality"],
+                                optimize=encoding["optimize"])
+    elif fmt == "webp":
+        img.convert("RGB").save(buffer, format="WEBP", quality=encoding["quality"], method=4)
+    elif fmt == "webp_lossless":
+        img.convert("RGB").save(buffer, format="WEBP", lossless=True, quality=encoding["quality"], method=4)
+    elif fmt == "png_palette":
+        # 卡片主要是纯色块，量化到调色板后体积明显变小
+        palette_img = img.convert("RGB").quantize(
+            colors=encoding["palette_colors"], method=Image.Quantize.FASTOCTREE)
+        palette_img.save(buffer, format="PNG", compress_level=encoding["compress_level"],
+                         optimize=encoding["optimize"])
+    else:
+        img.convert("RGB").save(buffer, format="PNG", compress_level=encoding["compress_level"],
+                                optimize=encoding["optimize"])
@@ -0,0 +1,156 @@
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from astrbot.api import logger
+
+# 图片数据开头的特征 -> 扩展名
+_SIGNATURES = (
+    (b"\x89PNG", ".png"),
+    (b"\xff\xd8", ".jpg"),
+    (b"RIFF", ".webp"),
+)
+
+
+def image_suffix(data: bytes) -> str:
+    """根据文件头判断图片扩展名"""
+    for signature, suffix in _SIGNATURES:
+        if data.startswith(signature):
+            return suffix
+    return ".img"
+
+
+class ImageStore:
+    """
+    发送图片用的磁盘缓存目录
+
+    渲染结果直接以原始字节写入文件，消息中只携带文件路径，
+    避免 base64 字符串在插件和平台适配器之间反复编码/解码。
+    文件名为内容哈希，相同的图片(如渲染缓存命中)只写入一次；
+    目录总大小超过 max_bytes 时按最近使用时间淘汰。
+    """
+
+    def __init__(self, directory: Optional[Union[str, Path]] = None, max_bytes: int = 64 * 1024 * 1024):
+        self.directory = Path(directory) if directory else None
+        self.max_bytes = max_bytes
+        self._files: "OrderedDict[str, int]" = OrderedDict()  # 文件名 -> 大小
+        self._bytes = 0
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.writes = 0
+        self.failures = 0
+
+    def configure(self, directory: Optional[Union[str, Path]] = None, max_bytes: Optional[int] = None) -> None:
+        """
+        更新缓存目录参数
+
+        Args:
+            directory: 缓存目录，为空时不写文件(全部回退为base64)
+            max_bytes: 目录中图片的总字节数上限
+        """
+        if directory is not None:
+            self.directory = Path(directory) if directory else None
+            self._files.clear()
+            self._bytes = 0
+            self._loaded = False
+        if max_bytes is not None:
+            self.max_bytes = max(0, int(max_bytes))
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None and self.max_bytes > 0
+
+    async def path_for(self, data: bytes) -> Optional[str]:
+        """
+        把图片写入缓存目录并返回文件路径
+
+        Args:
+            data: 编码后的图片数据
+
+        Returns:
+            文件的绝对路径，未启用、图片超过上限或写入失败时返回None
+        """
+        if not self.enabled or len(data) > self.max_bytes:
+            return None
+        name = hashlib.blake2b(data, digest_size=16).hexdigest() + image_suffix(data)
+        path = self.directory / name
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            try:
+                if not self._loaded:
+                    await loop.run_in_executor(None, self._load)
+                    self._loaded = True
+                if name in self._files:
+                    self._files.move_to_end(name)
+                    self.hits += 1
+                    return str(path.resolve())
+                await loop.run_in_executor(None, self._write, path, data)
+            except OSError as e:
+                self.failures += 1
+                logger.warning(f"写入图片缓存失败，改用base64发送: {e}")
+                return None
+            self.writes += 1
+            self._files[name] = len(data)
+            self._bytes += len(data)
+            # 刚写入的文件在最末尾，不会被本次淘汰
+            removed = self._evict()
+        if removed:
+            await loop.run_in_executor(None, self._remove, removed)
+        return str(path.resolve())
+
+    def _load(self) -> None:
+        """登记目录中已有的图片(按修改时间排序)，清理写入中断留下的临时文件"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for path in self.directory.iterdir():
+            if path.suffix == ".tmp":
+                path.unlink(missing_ok=True)
+            elif path.is_file():
+                stat = path.stat()
+                entries.append((stat.st_mtime, path.name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._files[name] = size
+            self._bytes += size
+        removed = self._evict()
+        if removed:
+            self._remove(removed)
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> None:
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _evict(self) -> list:
+        removed = []
+        while self._bytes > self.max_bytes and len(self._files) > 1:
+            name, size = self._files.popitem(last=False)
+            self._bytes -= size
+            removed.append(name)
+        return removed
+
+    def _remove(self, names: list) -> None:
+        for name in names:
+            try:
+                (self.directory / name).unlink(missing_ok=True)
+            except OSError as e:
+                logger.debug(f"删除图片缓存 {name} 失败: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """返回缓存统计信息"""
+        return {
+            "files": len(self._files),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "writes": self.writes,
+            "failures": self.failures,
+        }
+
+
+# 进程级共享实例
+image_store = ImageStore()
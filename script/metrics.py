@@ -0,0 +1,195 @@
+import asyncio
+import json
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from astrbot.api import logger
+
+# 各阶段: dns 地址解析; status 状态查询; query 玩家列表查询; fetch 单个服务器完整查询;
+# draw 绘制; encode 图片编码; render 渲染池提交到返回(含排队); mc 整个 /mc 命令
+STAGES = ("dns", "status", "query", "fetch", "draw", "encode", "render", "mc")
+
+# 渲染池工作线程/进程中收集的阶段耗时
+_collector = threading.local()
+
+
+class RollingHistogram:
+    """最近 size 个样本的环形缓冲区，百分位数只在读取时计算"""
+
+    __slots__ = ("samples", "index", "count", "total")
+
+    def __init__(self, size: int):
+        self.samples = array("d", bytes(8 * size))
+        self.index = 0
+        self.count = 0  # 累计样本数
+        self.total = 0.0  # 累计耗时
+
+    def add(self, value: float) -> None:
+        self.samples[self.index] = value
+        self.index = (self.index + 1) % len(self.samples)
+        self.count += 1
+        self.total += value
+
+    def percentiles(self, *ps: float) -> List[float]:
+        window = sorted(self.samples[:min(self.count, len(self.samples))])
+        if not window:
+            return [0.0] * len(ps)
+        return [window[min(len(window) - 1, int(p / 100 * len(window)))] for p in ps]
+
+
+class Metrics:
+    """
+    分阶段耗时统计
+
+    每个阶段保留最近 window 个样本；网络相关阶段另外按地址统计，
+    地址数超过 max_hosts 时淘汰最久未更新的地址。
+    """
+
+    def __init__(self, window: int = 512, host_window: int = 64, max_hosts: int = 256):
+        self.window = window
+        self.host_window = host_window
+        self.max_hosts = max_hosts
+        self._stages: Dict[str, RollingHistogram] = {}
+        self._hosts: "OrderedDict[str, Dict[str, RollingHistogram]]" = OrderedDict()
+        # 渲染线程也会记录耗时
+        self._lock = threading.Lock()
+        self._log_task: Optional[asyncio.Task] = None
+
+    def record(self, stage: str, seconds: float, host: Optional[str] = None) -> None:
+        """记录一次耗时(秒)"""
+        ms = seconds * 1000
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = RollingHistogram(self.window)
+            histogram.add(ms)
+
+            if host is None:
+                return
+            key = host.strip().lower()
+            stages = self._hosts.get(key)
+            if stages is None:
+                stages = self._hosts[key] = {}
+                while len(self._hosts) > self.max_hosts:
+                    self._hosts.popitem(last=False)
+            else:
+                self._hosts.move_to_end(key)
+            histogram = stages.get(stage)
+            if histogram is None:
+                histogram = stages[stage] = RollingHistogram(self.host_window)
+            histogram.add(ms)
+
+    @contextmanager
+    def timer(self, stage: str, host: Optional[str] = None) -> Iterator[None]:
+        """计时上下文，可以跨 await 使用"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, host)
+
+    async def timed(self, stage: str, awaitable: Awaitable[Any], host: Optional[str] = None) -> Any:
+        """等待 awaitable 并记录耗时(失败也记录)"""
+        with self.timer(stage, host):
+            return await awaitable
+
+    def snapshot(self, host: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """
+        各阶段的统计
+
+        Args:
+            host: 指定时只返回该地址的统计
+
+        Returns:
+            {阶段: {"count", "avg", "p50", "p95", "p99"}}，耗时单位为毫秒
+        """
+        with self._lock:
+            if host is None:
+                stages = self._stages
+            else:
+                stages = self._hosts.get(host.strip().lower(), {})
+            result = {}
+            for stage in sorted(stages, key=lambda s: STAGES.index(s) if s in STAGES else len(STAGES)):
+                histogram = stages[stage]
+                p50, p95, p99 = histogram.percentiles(50, 95, 99)
+                result[stage] = {
+                    "count": histogram.count,
+                    "avg": round(histogram.total / histogram.count, 2) if histogram.count else 0.0,
+                    "p50": round(p50, 2),
+                    "p95": round(p95, 2),
+                    "p99": round(p99, 2),
+                }
+            return result
+
+    def slowest_hosts(self, stage: str = "fetch", limit: int = 5) -> List[Tuple[str, float, float]]:
+        """按某阶段 p95 排序的最慢地址 [(地址, p50, p95), ...]"""
+        with self._lock:
+            rows = []
+            for host, stages in self._hosts.items():
+                histogram = stages.get(stage)
+                if histogram is not None and histogram.count:
+                    p50, p95 = histogram.percentiles(50, 95)
+                    rows.append((host, round(p50, 2), round(p95, 2)))
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows[:limit]
+
+    def start_periodic_log(self, interval: float, counters: Callable[[], Dict[str, Any]]) -> None:
+        """
+        每隔 interval 秒输出一行结构化(JSON)日志
+
+        Args:
+            interval: 间隔(秒)，不大于0时不启动
+            counters: 返回缓存/连接池等计数器的函数
+        """
+        if interval <= 0 or (self._log_task is not None and not self._log_task.done()):
+            return
+        self._log_task = asyncio.ensure_future(self._log_loop(interval, counters))
+
+    async def _log_loop(self, interval: float, counters: Callable[[], Dict[str, Any]]) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                line = {"stages": self.snapshot(), "counters": counters()}
+                logger.info("mcgetter_perf " + json.dumps(line, ensure_ascii=False, default=str))
+            except Exception as e:
+                logger.error(f"输出性能日志失败: {e}")
+
+    async def stop(self) -> None:
+        if self._log_task is not None:
+            self._log_task.cancel()
+            await asyncio.gather(self._log_task, return_exceptions=True)
+            self._log_task = None
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """
+    在渲染函数内部计时
+
+    渲染可能在进程池中执行，无法直接写入主进程的统计；
+    这里把耗时记录到当前线程的收集器，由 collect_timings 随结果一起返回。
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = getattr(_collector, "timings", None)
+        if timings is not None:
+            timings.append((stage, time.perf_counter() - start))
+
+
+def collect_timings(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Tuple[Any, List[Tuple[str, float]]]:
+    """在渲染池中执行 fn，返回 (结果, [(阶段, 耗时秒), ...])"""
+    _collector.timings = []
+    try:
+        return fn(*args, **kwargs), _collector.timings
+    finally:
+        _collector.timings = None
+
+
+# 进程级共享实例
+metrics = Metrics()
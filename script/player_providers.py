@@ -0,0 +1,217 @@
+import asyncio
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import aiohttp
+
+from astrbot.api import logger
+
+
+def _names(data: Any, *fields: str) -> List[str]:
+    """从 {"players": [{...}, ...]} 中依次尝试字段取玩家名"""
+    players = data.get("players") if isinstance(data, dict) else None
+    names = []
+    for player in players or []:
+        if not isinstance(player, dict):
+            continue
+        for key in fields:
+            value = player.get(key)
+            if value:
+                names.append(str(value))
+                break
+    return names
+
+
+def parse_dynmap(data: Any) -> List[str]:
+    """Dynmap up/world/{world}/{timestamp}: name 可能带颜色代码，优先使用 account"""
+    return _names(data, "account", "name")
+
+
+def parse_bluemap(data: Any) -> List[str]:
+    """BlueMap maps/{map}/live/players.json"""
+    return _names(data, "name")
+
+
+def parse_squaremap(data: Any) -> List[str]:
+    """squaremap/Pl3xMap tiles/players.json"""
+    return _names(data, "name")
+
+
+# 提供者类型 -> 解析函数
+PROVIDERS: Dict[str, Callable[[Any], List[str]]] = {
+    "dynmap": parse_dynmap,
+    "bluemap": parse_bluemap,
+    "squaremap": parse_squaremap,
+    "json": parse_squaremap,  # 通用格式: {"players": [{"name": ...}]}
+}
+
+
+def validate_provider(provider: str, url: str) -> Optional[str]:
+    """
+    检查玩家列表提供者设置(/mcmap 和 /mcimport 共用)
+
+    Args:
+        provider: 提供者类型
+        url: 玩家列表JSON地址
+
+    Returns:
+        不合法时返回原因，合法时返回None
+    """
+    if provider not in PROVIDERS:
+        return f"不支持的类型 {provider}，可选: {'、'.join(PROVIDERS)}"
+    if not re.match(r'^https?://', url or ""):
+        return "玩家列表地址需要以 http:// 或 https:// 开头"
+    return None
+
+
+@dataclass
+class _CacheEntry:
+    names: List[str]
+    fetched_at: float  # time.monotonic()
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class PlayerListClient:
+    """
+    网页地图玩家列表客户端
+
+    所有请求共用一个长连接池(keep-alive)的 aiohttp 会话；
+    结果在 ttl 秒内直接复用，过期后带 If-None-Match/If-Modified-Since 条件请求，
+    地图未变化时服务器返回 304，不需要重新下载和解析。同一URL的并发请求只发起一次。
+    """
+
+    def __init__(self, ttl: float = 10.0, timeout: float = 5.0, max_connections: int = 20,
+                 name_filter: str = "", max_entries: int = 256):
+        self.ttl = ttl
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.name_filter = re.compile(name_filter) if name_filter else None
+        self.max_entries = max_entries
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._cache: Dict[str, _CacheEntry] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.requests = 0
+        self.not_modified = 0
+        self.hits = 0
+
+    def configure(self, ttl: Optional[float] = None, timeout: Optional[float] = None,
+                  max_connections: Optional[int] = None, name_filter: Optional[str] = None) -> None:
+        """
+        更新客户端参数
+
+        Args:
+            ttl: 结果直接复用的时间(秒)
+            timeout: 单次请求超时(秒)
+            max_connections: 连接池大小
+            name_filter: 要排除的玩家名正则(如 ^bot_)，空字符串表示不过滤
+        """
+        if ttl is not None:
+            self.ttl = max(0.0, float(ttl))
+        if timeout is not None:
+            self.timeout = max(0.5, float(timeout))
+        if max_connections is not None:
+            self.max_connections = max(1, int(max_connections))
+        if name_filter is not None:
+            try:
+                self.name_filter = re.compile(name_filter) if name_filter else None
+            except re.error as e:
+                logger.warning(f"玩家名过滤正则无效: {e}")
+                self.name_filter = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"Accept": "application/json"})
+        return self._session
+
+    async def fetch(self, provider: str, url: str) -> Optional[List[str]]:
+        """
+        获取网页地图上的在线玩家名
+
+        Args:
+            provider: 提供者类型(dynmap/bluemap/squaremap/json)
+            url: 玩家列表JSON地址
+
+        Returns:
+            排序后的玩家名列表，请求失败时返回None
+        """
+        parser = PROVIDERS.get(provider)
+        if parser is None:
+            logger.warning(f"未知的玩家列表提供者: {provider}")
+            return None
+
+        entry = self._cache.get(url)
+        if entry is not None and time.monotonic() - entry.fetched_at < self.ttl:
+            self.hits += 1
+            return self._filter(entry.names)
+
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._request(url, parser))
+            self._inflight[url] = task
+            task.add_done_callback(lambda t, u=url: self._inflight.pop(u, None))
+        try:
+            names = await asyncio.shield(task)
+        except Exception as e:
+            logger.warning(f"获取玩家列表 {url} 失败: {e}")
+            return None
+        return self._filter(names)
+
+    def _filter(self, names: List[str]) -> List[str]:
+        if self.name_filter is None:
+            return list(names)
+        return [name for name in names if not self.name_filter.search(name)]
+
+    async def _request(self, url: str, parser: Callable[[Any], List[str]]) -> List[str]:
+        entry = self._cache.get(url)
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        self.requests += 1
+        async with self._get_session().get(url, headers=headers) as response:
+            if response.status == 304 and entry is not None:
+                self.not_modified += 1
+                entry.fetched_at = time.monotonic()
+                return entry.names
+            if response.status != 200:
+                raise ValueError(f"请求失败，状态码: {response.status}")
+            # 部分地图以 text/plain 返回JSON
+            data = await response.json(content_type=None)
+            names = sorted(set(parser(data)))
+            self._cache[url] = _CacheEntry(
+                names=names,
+                fetched_at=time.monotonic(),
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"))
+            while len(self._cache) > self.max_entries:
+                self._cache.pop(next(iter(self._cache)))
+            return names
+
+    async def close(self) -> None:
+        """关闭连接池"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def stats(self) -> Dict[str, int]:
+        """返回请求统计信息"""
+        return {
+            "cached": len(self._cache),
+            "requests": self.requests,
+            "not_modified": self.not_modified,
+            "hits": self.hits,
+        }
+
+
+# 进程级共享实例
+player_list_client = PlayerListClient()
@@ -0,0 +1,199 @@
+import asyncio
+import heapq
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from astrbot.api import logger
+from .get_server_info import get_server_status
+
+
+@dataclass
+class Snapshot:
+    """后台轮询得到的服务器状态快照"""
+    info: Optional[Dict[str, Any]]  # None 表示查询失败(离线)
+    fetched_at: float  # time.time()
+
+    @property
+    def age(self) -> float:
+        return max(0.0, time.time() - self.fetched_at)
+
+
+def format_age(seconds: float) -> str:
+    """把快照年龄格式化为粗粒度的文字，避免每秒都导致重新渲染"""
+    if seconds < 10:
+        return "刚刚更新"
+    if seconds < 60:
+        return f"{int(seconds) // 10 * 10}秒前更新"
+    if seconds < 3600:
+        return f"{int(seconds) // 60}分钟前更新"
+    return f"{int(seconds) // 3600}小时前更新"
+
+
+class BackgroundPoller:
+    """
+    后台轮询所有群保存的服务器，为 /mc 预先准备状态快照
+
+    - 每个地址只轮询一次，无论有多少个群保存了它
+    - 有玩家在线时按 online_interval 轮询，无人在线按 idle_interval，离线按 offline_interval
+    - 每次间隔加上 ±jitter 比例的随机抖动，分散请求
+    """
+
+    def __init__(
+        self,
+        registry,
+        online_interval: float = 30.0,
+        idle_interval: float = 120.0,
+        offline_interval: float = 300.0,
+        jitter: float = 0.2,
+        max_concurrency: int = 16,
+        reload_interval: float = 60.0
+    ):
+        self.registry = registry
+        self.online_interval = online_interval
+        self.idle_interval = idle_interval
+        self.offline_interval = offline_interval
+        self.jitter = jitter
+        self.max_concurrency = max(1, max_concurrency)
+        self.reload_interval = reload_interval
+
+        self._snapshots: Dict[str, Snapshot] = {}
+        # 规范化地址 -> 原始地址
+        self._hosts: Dict[str, str] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._due: Dict[str, float] = {}
+        self._polling: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._wake = asyncio.Event()
+        self._reload_requested = True
+        self._runner: Optional[asyncio.Task] = None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.polls = 0
+
+    @staticmethod
+    def _key(host: str) -> str:
+        return host.strip().lower()
+
+    def start(self) -> None:
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.ensure_future(self._run())
+            logger.info("后台轮询已启动")
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+            self._runner = None
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def request_reload(self) -> None:
+        """服务器列表变化后调用，尽快重新加载要轮询的地址"""
+        self._reload_requested = True
+        self._wake.set()
+
+    def get_snapshot(self, host: str, max_age: float) -> Optional[Snapshot]:
+        """
+        获取地址的最新快照
+
+        Args:
+            host: 服务器地址
+            max_age: 快照最大年龄(秒)，超过时视为不可用
+
+        Returns:
+            快照，不存在或已过期时返回None
+        """
+        snapshot = self._snapshots.get(self._key(host))
+        if snapshot is None or snapshot.age > max_age:
+            return None
+        return snapshot
+
+    async def _reload_hosts(self) -> None:
+        groups = await self.registry.all_groups()
+        hosts = {
+            self._key(info['host']): info['host']
+            for data in groups.values() for info in data.values()
+        }
+        now = time.monotonic()
+        for key in hosts.keys() - self._hosts.keys():
+            if key not in self._polling:
+                # 新地址在一个在线间隔内随机分散开始轮询
+                self._schedule(key, now + random.uniform(0, self.online_interval))
+        for key in self._hosts.keys() - hosts.keys():
+            self._due.pop(key, None)
+            self._snapshots.pop(key, None)
+        self._hosts = hosts
+        logger.debug(f"后台轮询地址数: {len(hosts)}")
+
+    def _schedule(self, key: str, due: float) -> None:
+        self._due[key] = due
+        heapq.heappush(self._heap, (due, key))
+
+    async def _run(self) -> None:
+        next_reload = 0.0
+        while True:
+            now = time.monotonic()
+            if self._reload_requested or now >= next_reload:
+                self._reload_requested = False
+                try:
+                    await self._reload_hosts()
+                except Exception as e:
+                    logger.error(f"后台轮询加载服务器列表失败: {e}")
+                next_reload = now + self.reload_interval
+
+            now = time.monotonic()
+            while self._heap and self._heap[0][0] <= now:
+                due, key = heapq.heappop(self._heap)
+                # 跳过已删除或已重新调度的旧条目
+                if self._due.get(key) != due or key not in self._hosts:
+                    continue
+                del self._due[key]
+                self._polling.add(key)
+                task = asyncio.ensure_future(self._poll(key, self._hosts[key]))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+            timeout = next_reload - now
+            if self._heap:
+                timeout = min(timeout, self._heap[0][0] - now)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=max(timeout, 0.05))
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def _poll(self, key: str, host: str) -> None:
+        info = None
+        try:
+            async with self._semaphore:
+                self.polls += 1
+                info = await get_server_status(host, use_cache=False)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug(f"后台轮询 {host} 失败: {e}")
+        finally:
+            self._polling.discard(key)
+
+        self._snapshots[key] = Snapshot(info=info, fetched_at=time.time())
+        if info is None:
+            interval = self.offline_interval
+        elif info.get('plays_online'):
+            interval = self.online_interval
+        else:
+            interval = self.idle_interval
+        interval *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        if key in self._hosts:
+            self._schedule(key, time.monotonic() + interval)
+            self._wake.set()
+
+    def stats(self) -> Dict[str, int]:
+        """返回轮询统计信息"""
+        return {
+            "hosts": len(self._hosts),
+            "snapshots": len(self._snapshots),
+            "polling": len(self._polling),
+            "polls": self.polls,
+        }
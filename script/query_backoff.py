@@ -0,0 +1,49 @@
+import time
+from typing import Dict, Optional, Tuple
+
+from astrbot.api import logger
+
+
+class QueryBackoff:
+    """
+    记录哪些服务器未开启 query
+
+    query 失败后在一段时间内不再尝试，间隔按指数增长直到 max_interval；
+    任意一次成功即清除记录。
+    """
+
+    def __init__(self, base_interval: float = 60.0, max_interval: float = 3600.0):
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        # host -> (连续失败次数, 下次允许尝试的时间)
+        self._failures: Dict[str, Tuple[int, float]] = {}
+
+    def configure(self, base_interval: Optional[float] = None, max_interval: Optional[float] = None) -> None:
+        """更新重试间隔参数"""
+        if base_interval is not None:
+            self.base_interval = max(0.0, float(base_interval))
+        if max_interval is not None:
+            self.max_interval = max(self.base_interval, float(max_interval))
+
+    @staticmethod
+    def _key(host: str) -> str:
+        return host.strip().lower()
+
+    def should_query(self, host: str) -> bool:
+        """当前是否应该尝试 query"""
+        entry = self._failures.get(self._key(host))
+        return entry is None or time.monotonic() >= entry[1]
+
+    def record_success(self, host: str) -> None:
+        self._failures.pop(self._key(host), None)
+
+    def record_failure(self, host: str) -> None:
+        key = self._key(host)
+        count = self._failures.get(key, (0, 0.0))[0] + 1
+        interval = min(self.base_interval * (2 ** (count - 1)), self.max_interval)
+        self._failures[key] = (count, time.monotonic() + interval)
+        logger.debug(f"{host} 的query连续失败 {count} 次，{interval:.0f}s 后再尝试")
+
+
+# 进程级共享实例
+query_backoff = QueryBackoff()
@@ -0,0 +1,232 @@
+import asyncio
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from astrbot.api import logger
+from .json_operate import read_json, write_json
+
+
+class ServerRegistry:
+    """
+    内存中的服务器列表
+
+    每个群的 {group_id}.json 只在首次访问或文件被外部修改(mtime变化)时读取，
+    修改在每个群的锁内完成，避免并发 /mcadd 互相覆盖；
+    写入延迟 flush_delay 秒合并后再原子写回磁盘(临时文件 + 替换)。
+    """
+
+    def __init__(self, data_dir: Path, flush_delay: float = 1.0):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.flush_delay = flush_delay
+        self._groups: Dict[str, Dict[str, Dict[str, str]]] = {}
+        self._mtimes: Dict[str, Optional[float]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._dirty: Set[str] = set()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def json_path(self, group_id: str) -> Path:
+        """群组的JSON文件路径"""
+        return self.data_dir / f'{group_id}.json'
+
+    def _lock(self, group_id: str) -> asyncio.Lock:
+        lock = self._locks.get(group_id)
+        if lock is None:
+            lock = self._locks[group_id] = asyncio.Lock()
+        return lock
+
+    def _file_mtime(self, group_id: str) -> Optional[float]:
+        try:
+            return os.stat(self.json_path(group_id)).st_mtime
+        except FileNotFoundError:
+            return None
+
+    async def _load(self, group_id: str) -> Dict[str, Dict[str, str]]:
+        """返回内存中的数据，必要时从磁盘(重新)加载；调用方需持有群锁"""
+        mtime = self._file_mtime(group_id)
+        if group_id in self._groups:
+            # 有未写回的修改时以内存为准
+            if group_id in self._dirty or mtime == self._mtimes.get(group_id):
+                return self._groups[group_id]
+            logger.info(f"检测到群 {group_id} 的服务器列表被外部修改，重新加载")
+
+        data = await read_json(self.json_path(group_id))
+        self._groups[group_id] = data
+        self._mtimes[group_id] = self._file_mtime(group_id)
+        return data
+
+    async def get_group(self, group_id: str) -> Dict[str, Dict[str, str]]:
+        """
+        获取群组的服务器列表
+
+        Args:
+            group_id: 群组ID
+
+        Returns:
+            {名称: {'name': 名称, 'host': 地址}} 的副本，保持添加顺序；
+            设置了玩家列表提供者的服务器还包含 'provider' 和 'provider_url'
+        """
+        async with self._lock(group_id):
+            data = await self._load(group_id)
+            return {name: dict(info) for name, info in data.items()}
+
+    async def all_groups(self) -> Dict[str, Dict[str, Dict[str, str]]]:
+        """
+        获取所有群组的服务器列表(会加载数据目录下的所有群组文件)
+
+        Returns:
+            {群组ID: {名称: {'name': 名称, 'host': 地址}}}
+        """
+        group_ids = {path.stem for path in self.data_dir.glob("*.json")} | set(self._groups)
+        result = {}
+        for group_id in sorted(group_ids):
+            try:
+                data = await self.get_group(group_id)
+            except Exception as e:
+                logger.error(f"读取群 {group_id} 的服务器列表失败: {e}")
+                continue
+            if data:
+                result[group_id] = data
+        return result
+
+    async def groups_for_host(self, host: str) -> List[str]:
+        """返回保存了该地址的所有群组ID"""
+        return [
+            group_id for group_id, data in (await self.all_groups()).items()
+            if any(info['host'] == host for info in data.values())
+        ]
+
+    async def find_host(self, group_id: str, host: str) -> Optional[str]:
+        """
+        查找群组中使用该地址的服务器
+
+        Returns:
+            已存在的服务器名称，不存在时返回None
+        """
+        async with self._lock(group_id):
+            data = await self._load(group_id)
+            for existing_name, server_info in data.items():
+                if server_info['host'] == host:
+                    return existing_name
+            return None
+
+    async def add(self, group_id: str, name: str, host: str) -> bool:
+        """
+        添加服务器，名称或地址已存在时不添加
+
+        Returns:
+            是否添加成功
+        """
+        async with self._lock(group_id):
+            data = await self._load(group_id)
+            if name in data or any(info['host'] == host for info in data.values()):
+                logger.warning(f"服务器名称或地址已存在: {name} -> {host}")
+                return False
+            data[name] = {'name': name, 'host': host}
+            self._mark_dirty(group_id)
+            logger.info(f"成功添加服务器数据: {name}")
+            return True
+
+    async def add_many(self, group_id: str, servers: List[Dict[str, str]]) -> List[bool]:
+        """
+        批量添加服务器，全部修改在一次加锁内完成并合并为一次写回
+
+        Args:
+            group_id: 群组ID
+            servers: [{'name', 'host', 可选 'provider', 'provider_url'}, ...]
+
+        Returns:
+            与 servers 顺序对应的是否添加成功(名称或地址已存在、或与前面的条目重复时为False)
+        """
+        results = []
+        async with self._lock(group_id):
+            data = await self._load(group_id)
+            hosts = {info['host'] for info in data.values()}
+            for server in servers:
+                name, host = server['name'], server['host']
+                if name in data or host in hosts:
+                    results.append(False)
+                    continue
+                info = {'name': name, 'host': host}
+                if server.get('provider'):
+                    info.update(provider=server['provider'], provider_url=server.get('provider_url', ''))
+                data[name] = info
+                hosts.add(host)
+                results.append(True)
+            if any(results):
+                self._mark_dirty(group_id)
+                logger.info(f"批量添加了 {sum(results)} 个服务器")
+        return results
+
+    async def delete(self, group_id: str, name: str) -> bool:
+        """
+        删除服务器
+
+        Returns:
+            是否删除成功
+        """
+        async with self._lock(group_id):
+            data = await self._load(group_id)
+            if name not in data:
+                logger.warning(f"服务器名称不存在: {name}")
+                return False
+            del data[name]
+            self._mark_dirty(group_id)
+            logger.info(f"成功删除服务器数据: {name}")
+            return True
+
+    async def set_provider(self, group_id: str, name: str, provider: str = "", url: str = "") -> bool:
+        """
+        设置服务器的玩家列表提供者(网页地图)，provider 为空时清除
+
+        Returns:
+            是否设置成功(服务器不存在时返回False)
+        """
+        async with self._lock(group_id):
+            data = await self._load(group_id)
+            if name not in data:
+                logger.warning(f"服务器名称不存在: {name}")
+                return False
+            if provider:
+                data[name].update(provider=provider, provider_url=url)
+            else:
+                data[name].pop('provider', None)
+                data[name].pop('provider_url', None)
+            self._mark_dirty(group_id)
+            return True
+
+    def _mark_dirty(self, group_id: str) -> None:
+        self._dirty.add(group_id)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._delayed_flush())
+
+    async def _delayed_flush(self) -> None:
+        await asyncio.sleep(self.flush_delay)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """立即把所有未写回的修改写入磁盘，写入失败的群会在下次修改时重试"""
+        failed: Set[str] = set()
+        while self._dirty - failed:
+            group_id = next(iter(self._dirty - failed))
+            async with self._lock(group_id):
+                self._dirty.discard(group_id)
+                try:
+                    await write_json(self.json_path(group_id), self._groups[group_id])
+                    self._mtimes[group_id] = self._file_mtime(group_id)
+                except asyncio.CancelledError:
+                    # 写入被中断(原文件未被替换)，留给下一次 flush
+                    self._dirty.add(group_id)
+                    raise
+                except IOError as e:
+                    logger.error(f"写回群 {group_id} 的服务器列表失败: {e}")
+                    self._dirty.add(group_id)
+                    failed.add(group_id)
+
+    async def close(self) -> None:
+        """取消延迟写入并立即写回(等待被取消的任务结束，中断的写入会重新写回)"""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        await self.flush()
@@ -0,0 +1,101 @@
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class RenderCache:
+    """
+    渲染结果缓存
+
+    以渲染输入的哈希为键保存编码好的图片，服务器状态没有变化时直接复用。
+    延迟按 latency_bucket 毫秒分桶参与计算键，因此小幅抖动不会导致重新渲染，
+    命中时图片上显示的是同一分桶内首次渲染时的延迟。
+    超过 max_bytes 时按 LRU 淘汰。
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, latency_bucket: int = 20):
+        self.max_bytes = max_bytes
+        self.latency_bucket = latency_bucket
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, max_bytes: Optional[int] = None, latency_bucket: Optional[int] = None) -> None:
+        """
+        更新缓存参数
+
+        Args:
+            max_bytes: 缓存图片的总字节数上限，为0时禁用缓存
+            latency_bucket: 延迟分桶宽度(毫秒)
+        """
+        if max_bytes is not None:
+            self.max_bytes = max(0, int(max_bytes))
+        if latency_bucket is not None:
+            self.latency_bucket = max(1, int(latency_bucket))
+        self._evict()
+
+    def make_key(self, kind: str, **inputs: Any) -> str:
+        """
+        根据渲染类型和渲染输入计算缓存键
+
+        Args:
+            kind: 渲染类型，区分不同的渲染函数
+            **inputs: 渲染函数的全部输入，其中的 latency 字段会被分桶
+
+        Returns:
+            十六进制哈希字符串
+        """
+        payload = json.dumps([kind, self._bucket_latency(inputs)], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _bucket_latency(self, value: Any) -> Any:
+        """递归地把 latency 字段替换为所在分桶(汇总图的每个条目也有 latency)"""
+        if isinstance(value, dict):
+            return {
+                k: int(v) // self.latency_bucket if k == "latency" and isinstance(v, (int, float))
+                else self._bucket_latency(v)
+                for k, v in value.items()
+            }
+        if isinstance(value, (list, tuple)):
+            return [self._bucket_latency(v) for v in value]
+        return value
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old)
+        self._entries[key] = value
+        self._bytes += size
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and self._entries:
+            _, value = self._entries.popitem(last=False)
+            self._bytes -= len(value)
+
+    def stats(self) -> Dict[str, int]:
+        """返回缓存统计信息"""
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# 进程级共享实例
+render_cache = RenderCache()
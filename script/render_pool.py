@@ -0,0 +1,128 @@
+import asyncio
+import functools
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from astrbot.api import logger
+from .metrics import metrics, collect_timings
+
+
+class RenderPool:
+    """
+    图片渲染工作池
+
+    Pillow 绘制和编码都是同步的CPU操作，放在事件循环里会阻塞整个机器人。
+    这里把渲染任务提交到线程池或进程池执行，并用信号量限制排队数量，
+    队列满时调用方会等待(背压)，而不是无限堆积任务。
+    """
+
+    MODES = ("thread", "process")
+
+    def __init__(self, mode: str = "thread", workers: Optional[int] = None, max_pending: int = 64):
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 2
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._initializer: Optional[Callable[..., Any]] = None
+        self._initargs: tuple = ()
+        self.submitted = 0
+        self.waited = 0
+
+    def configure(self, mode: Optional[str] = None, workers: Optional[int] = None,
+                  max_pending: Optional[int] = None) -> None:
+        """
+        更新工作池参数，已创建的执行器会被关闭并在下次提交时重建
+
+        Args:
+            mode: "thread" 或 "process"
+            workers: 工作线程/进程数量，0或None表示使用CPU核数
+            max_pending: 允许同时执行和排队的任务总数
+        """
+        if mode is not None:
+            if mode not in self.MODES:
+                logger.warning(f"未知的渲染池模式 {mode}，使用 thread")
+                mode = "thread"
+            self.mode = mode
+        if workers is not None:
+            self.workers = int(workers) or os.cpu_count() or 2
+        if max_pending is not None:
+            self.max_pending = max(1, int(max_pending))
+        self.shutdown()
+
+    def set_initializer(self, initializer: Callable[..., Any], *initargs: Any) -> None:
+        """
+        设置进程池工作进程的初始化函数(如字体配置)，线程池共享进程状态无需初始化
+
+        Args:
+            initializer: 模块级函数
+            *initargs: 传给初始化函数的参数
+        """
+        self._initializer = initializer
+        self._initargs = initargs
+        self.shutdown()
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=self._initializer,
+                    initargs=self._initargs)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="mcgetter-render")
+            logger.info(f"渲染池已启动: {self.mode} x {self.workers}")
+        return self._executor
+
+    async def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        提交一个同步渲染函数并等待结果
+
+        Args:
+            fn: 模块级的同步函数(进程池模式下需要可被pickle)
+            *args: 位置参数
+            **kwargs: 关键字参数
+
+        Returns:
+            fn 的返回值
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+        if self._semaphore.locked():
+            self.waited += 1
+            logger.debug("渲染队列已满，等待空闲")
+        start = time.perf_counter()
+        async with self._semaphore:
+            self.submitted += 1
+            loop = asyncio.get_running_loop()
+            # 工作线程/进程内的绘制和编码耗时随结果一起返回
+            result, timings = await loop.run_in_executor(
+                self._get_executor(), functools.partial(collect_timings, fn, *args, **kwargs))
+        for stage, seconds in timings:
+            metrics.record(stage, seconds)
+        metrics.record("render", time.perf_counter() - start)
+        return result
+
+    def shutdown(self) -> None:
+        """关闭执行器，正在执行的任务会继续完成"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._semaphore = None
+
+    def stats(self) -> Dict[str, Any]:
+        """返回工作池统计信息"""
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "submitted": self.submitted,
+            "waited": self.waited,
+        }
+
+
+# 进程级共享实例
+render_pool = RenderPool()
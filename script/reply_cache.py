@@ -0,0 +1,115 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from astrbot.api import logger
+
+
+class ReplyCache:
+    """
+    按群合并 /mc 请求并短时复用回复
+
+    - 同一个群的 /mc 正在执行时，后来的调用等待同一次执行并得到相同的回复
+    - 执行完成的回复在 ttl 秒内直接复用，超过容量时按 LRU 淘汰
+    - 服务器列表变化时调用 invalidate，进行中的执行结果也不会被缓存
+    """
+
+    def __init__(self, ttl: float = 10.0, max_groups: int = 64):
+        self.ttl = ttl
+        self.max_groups = max_groups
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def configure(self, ttl: Optional[float] = None, max_groups: Optional[int] = None) -> None:
+        """
+        更新缓存参数
+
+        Args:
+            ttl: 回复复用时间(秒)，为0时不复用但仍合并并发请求
+            max_groups: 最多缓存回复的群数量
+        """
+        if ttl is not None:
+            self.ttl = max(0.0, float(ttl))
+        if max_groups is not None:
+            self.max_groups = max(1, int(max_groups))
+        self._evict()
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_groups:
+            self._entries.popitem(last=False)
+
+    def _peek(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, reply = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return reply
+
+    def invalidate(self, key: str) -> None:
+        """丢弃指定群的缓存回复，进行中的执行完成后也不写入缓存"""
+        self._entries.pop(key, None)
+        self._inflight.pop(key, None)
+
+    async def get(self, key: str, builder: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        获取群的回复，没有可复用的回复时调用 builder 生成
+
+        Args:
+            key: 群组ID
+            builder: 生成回复的协程函数
+
+        Returns:
+            builder 的返回值(多个调用方共享同一个对象，不要修改)
+        """
+        reply = self._peek(key)
+        if reply is not None:
+            self.hits += 1
+            return reply
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(builder())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._on_done(k, t))
+        else:
+            self.coalesced += 1
+            logger.debug(f"合并群 {key} 的并发 /mc 请求")
+
+        # shield: 单个调用方被取消时不影响其他等待同一次执行的调用方
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is not task:
+            # 执行期间服务器列表发生了变化
+            return
+        del self._inflight[key]
+        if task.cancelled() or task.exception() is not None or self.ttl <= 0:
+            return
+        result = task.result()
+        if result is not None:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def stats(self) -> Dict[str, int]:
+        """返回缓存统计信息"""
+        return {
+            "size": len(self._entries),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
+
+
+# 进程级共享实例
+reply_cache = ReplyCache()
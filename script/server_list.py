@@ -0,0 +1,70 @@
+import json
+import re
+from typing import Any, Dict, List
+
+# 与 /mcadd 相同的地址格式检查
+HOST_PATTERN = re.compile(r'^[a-zA-Z0-9.,:]+$')
+
+
+def _entry(name: Any, host: Any, provider: Any = "", provider_url: Any = "") -> Dict[str, str]:
+    entry = {'name': str(name).strip(), 'host': str(host).strip()}
+    if provider:
+        entry.update(provider=str(provider).strip().lower(), provider_url=str(provider_url or "").strip())
+    return entry
+
+
+def parse_server_list(text: str) -> List[Dict[str, str]]:
+    """
+    解析批量导入的服务器列表
+
+    支持三种格式:
+    - 每行一个服务器: "名称 地址"，只有地址时名称与地址相同
+    - JSON 列表: [{"name": ..., "host": ...}, ...] 或 ["地址", ...]
+    - JSON 对象(/mcexport 的格式): {名称: {"name": ..., "host": ...}}
+
+    Args:
+        text: 命令后的文本
+
+    Returns:
+        [{'name', 'host', 可选 'provider', 'provider_url'}, ...]，保持输入顺序
+
+    Raises:
+        ValueError: 格式不正确
+    """
+    text = text.strip()
+    if text[:1] in ("[", "{"):
+        try:
+            data = json.loads(text)
+        except ValueError as e:
+            raise ValueError(f"JSON 格式不正确: {e}") from e
+        if isinstance(data, dict):
+            data = [{'name': name, **info} if isinstance(info, dict) else {'name': name, 'host': info}
+                    for name, info in data.items()]
+        entries = []
+        for item in data:
+            if isinstance(item, str) and item.strip():
+                entries.append(_entry(item, item))
+            elif isinstance(item, dict) and item.get('host'):
+                entries.append(_entry(item.get('name') or item['host'], item['host'],
+                                      item.get('provider', ""), item.get('provider_url', "")))
+            else:
+                raise ValueError(f"无法识别的条目: {item}")
+        return entries
+
+    entries = []
+    for line in text.splitlines():
+        parts = line.split()
+        if not parts:
+            continue
+        if len(parts) == 1:
+            entries.append(_entry(parts[0], parts[0]))
+        elif len(parts) == 2:
+            entries.append(_entry(parts[0], parts[1]))
+        else:
+            raise ValueError(f"无法识别的行: {line.strip()}")
+    return entries
+
+
+def dump_server_list(group: Dict[str, Dict[str, str]]) -> str:
+    """把群组的服务器列表导出为可以直接用于 /mcimport 的JSON"""
+    return json.dumps(list(group.values()), ensure_ascii=False, indent=2)
@@ -0,0 +1,268 @@
+import asyncio
+import json
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from astrbot.api import logger
+
+# 握手时使用的协议版本号，与 mcstatus 默认值一致；服务器会在响应中返回自己的版本
+PROTOCOL_VERSION = 47
+# 状态响应的最大长度，防止异常服务器发送超大数据
+MAX_PACKET_SIZE = 2 * 1024 * 1024
+# ping/pong 的超时(秒)；不响应ping的服务器改用状态请求的往返时间作为延迟
+PING_TIMEOUT = 1.0
+
+_LONG = struct.Struct(">q")
+_USHORT = struct.Struct(">H")
+
+
+class SLPError(Exception):
+    """服务器返回了无法解析的响应"""
+
+
+@dataclass
+class SLPStatus:
+    """Server List Ping 的结果"""
+    latency: float  # 毫秒
+    version_name: str
+    protocol: int
+    players_online: int
+    players_max: int
+    sample: List[str] = field(default_factory=list)  # 玩家名样本
+    icon: Optional[str] = None  # data:image/png;base64,...
+    raw: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any], latency: float) -> "SLPStatus":
+        version = data.get("version") or {}
+        players = data.get("players") or {}
+        return cls(
+            latency=latency,
+            version_name=str(version.get("name", "")),
+            protocol=int(version.get("protocol", -1)),
+            players_online=int(players.get("online", 0)),
+            players_max=int(players.get("max", 0)),
+            sample=[str(player.get("name", "")) for player in players.get("sample") or []
+                    if isinstance(player, dict)],
+            icon=data.get("favicon"),
+            raw=data,
+        )
+
+    @classmethod
+    def from_mcstatus(cls, status) -> "SLPStatus":
+        """把 mcstatus 的 JavaStatusResponse 转换为同样的结构"""
+        return cls(
+            latency=status.latency,
+            version_name=status.version.name,
+            protocol=status.version.protocol,
+            players_online=status.players.online,
+            players_max=status.players.max,
+            sample=[player.name for player in status.players.sample or []],
+            icon=status.icon,
+            raw=status.raw,
+        )
+
+
+def encode_varint(value: int) -> bytes:
+    value &= 0xFFFFFFFF
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def decode_varint(buffer: memoryview, offset: int) -> Tuple[int, int]:
+    """从缓冲区读取 VarInt，返回 (值, 新偏移)"""
+    result = 0
+    for shift in range(0, 35, 7):
+        if offset >= len(buffer):
+            raise SLPError("VarInt 不完整")
+        byte = buffer[offset]
+        offset += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            if result & 0x80000000:
+                result -= 1 << 32
+            return result, offset
+    raise SLPError("VarInt 过长")
+
+
+async def _read_varint(reader: asyncio.StreamReader) -> int:
+    result = 0
+    for shift in range(0, 35, 7):
+        byte = (await reader.readexactly(1))[0]
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result
+    raise SLPError("VarInt 过长")
+
+
+def _packet(packet_id: int, payload: bytes = b"") -> bytes:
+    body = encode_varint(packet_id) + payload
+    return encode_varint(len(body)) + body
+
+
+def build_handshake(host: str, port: int, protocol: int = PROTOCOL_VERSION) -> bytes:
+    """握手包(下一状态为 status) + 状态请求包，一次写入"""
+    host_bytes = host.encode("utf-8")
+    payload = (encode_varint(protocol) + encode_varint(len(host_bytes)) + host_bytes
+               + _USHORT.pack(port) + encode_varint(1))
+    return _packet(0x00, payload) + _packet(0x00)
+
+
+async def _read_packet(reader: asyncio.StreamReader) -> Tuple[int, memoryview]:
+    """读取一个数据包，返回 (包ID, 包体视图)；包体只读取一次，不做额外拷贝"""
+    length = await _read_varint(reader)
+    if length <= 0 or length > MAX_PACKET_SIZE:
+        raise SLPError(f"数据包长度异常: {length}")
+    data = memoryview(await reader.readexactly(length))
+    packet_id, offset = decode_varint(data, 0)
+    return packet_id, data[offset:]
+
+
+def parse_status_payload(payload: memoryview) -> Dict[str, Any]:
+    """解析状态响应包体中的 JSON 字符串(直接从缓冲区解码，不复制 bytes)"""
+    length, offset = decode_varint(payload, 0)
+    if length < 0 or offset + length > len(payload):
+        raise SLPError("状态响应长度不匹配")
+    try:
+        data = json.loads(str(payload[offset:offset + length], "utf-8"))
+    except (UnicodeDecodeError, ValueError) as e:
+        raise SLPError(f"状态响应不是有效的JSON: {e}") from e
+    if not isinstance(data, dict):
+        raise SLPError("状态响应格式错误")
+    return data
+
+
+class SLPClient:
+    """
+    原生 asyncio Server List Ping 客户端
+
+    握手、状态请求和 ping/pong 使用同一个TCP连接：握手和状态请求合并为一次写入，
+    整个过程受一个总超时约束。所有连接共享一个全局套接字预算(max_sockets)，
+    批量查询大量服务器时不会耗尽文件描述符。
+    """
+
+    def __init__(self, timeout: float = 3.0, max_sockets: int = 256):
+        self.timeout = timeout
+        self.max_sockets = max_sockets
+        self._budget: Optional[asyncio.Semaphore] = None
+        self.connections = 0
+        self.failures = 0
+
+    def configure(self, timeout: Optional[float] = None, max_sockets: Optional[int] = None) -> None:
+        """
+        更新客户端参数
+
+        Args:
+            timeout: 单次查询的总超时(秒)，包括连接、状态和ping
+            max_sockets: 同时打开的连接数上限
+        """
+        if timeout is not None:
+            self.timeout = max(0.1, float(timeout))
+        if max_sockets is not None:
+            self.max_sockets = max(1, int(max_sockets))
+            self._budget = None
+
+    def _get_budget(self) -> asyncio.Semaphore:
+        if self._budget is None:
+            self._budget = asyncio.Semaphore(self.max_sockets)
+        return self._budget
+
+    async def status(self, host: str, port: int = 25565, connect_host: Optional[str] = None,
+                     timeout: Optional[float] = None) -> SLPStatus:
+        """
+        查询服务器状态
+
+        Args:
+            host: 握手中发送的主机名(虚拟主机/转发依赖它)
+            port: 端口
+            connect_host: 实际连接的地址(如已解析的IP)，默认与 host 相同
+            timeout: 总超时，默认使用配置值
+
+        Returns:
+            服务器状态
+
+        Raises:
+            ConnectionRefusedError/OSError: 连接失败
+            asyncio.TimeoutError: 超时
+            SLPError: 响应无法解析
+        """
+        async with self._get_budget():
+            self.connections += 1
+            timeout = timeout or self.timeout
+            deadline = asyncio.get_running_loop().time() + timeout
+            try:
+                return await asyncio.wait_for(
+                    self._status(host, port, connect_host or host, deadline),
+                    timeout=timeout
+                )
+            except BaseException:
+                self.failures += 1
+                raise
+
+    async def _status(self, host: str, port: int, connect_host: str, deadline: float) -> SLPStatus:
+        reader, writer = await asyncio.open_connection(connect_host, port)
+        try:
+            start = time.perf_counter()
+            writer.write(build_handshake(host, port))
+            await writer.drain()
+
+            packet_id, payload = await _read_packet(reader)
+            status_rtt = (time.perf_counter() - start) * 1000
+            if packet_id != 0x00:
+                raise SLPError(f"意外的数据包ID: {packet_id}")
+            data = parse_status_payload(payload)
+
+            # ping/pong 测量延迟；部分服务器发送状态后即关闭连接或不响应ping，此时使用状态请求的往返时间。
+            # ping 单独限时(不超过剩余时间的一半)，不会因为等待ping导致整个查询超时而丢弃已得到的状态
+            latency = status_rtt
+            remaining = deadline - asyncio.get_running_loop().time()
+            try:
+                pong = await asyncio.wait_for(
+                    self._ping(reader, writer), timeout=min(PING_TIMEOUT, max(0.0, remaining) / 2))
+                if pong is not None:
+                    latency = pong
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, SLPError) as e:
+                logger.debug(f"{host}:{port} 未响应ping: {e!r}")
+
+            return SLPStatus.from_json(data, latency)
+        except asyncio.IncompleteReadError as e:
+            raise SLPError("服务器提前关闭了连接") from e
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    @staticmethod
+    async def _ping(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> Optional[float]:
+        """发送ping并等待pong，返回往返时间(毫秒)，响应不匹配时返回None"""
+        token = int(time.time() * 1000)
+        start = time.perf_counter()
+        writer.write(_packet(0x01, _LONG.pack(token)))
+        await writer.drain()
+        packet_id, payload = await _read_packet(reader)
+        if packet_id == 0x01 and len(payload) >= 8 and _LONG.unpack_from(payload)[0] == token:
+            return (time.perf_counter() - start) * 1000
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        """返回连接统计信息"""
+        return {
+            "max_sockets": self.max_sockets,
+            "connections": self.connections,
+            "failures": self.failures,
+        }
+
+
+# 进程级共享实例
+slp_client = SLPClient()
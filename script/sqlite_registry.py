@@ -0,0 +1,218 @@
+import asyncio
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from astrbot.api import logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS servers (
+    group_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    host TEXT NOT NULL,
+    provider TEXT,
+    provider_url TEXT,
+    PRIMARY KEY (group_id, name)
+);
+CREATE INDEX IF NOT EXISTS idx_servers_host ON servers (host, group_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class SQLiteRegistry:
+    """
+    基于 SQLite 的服务器列表，接口与 ServerRegistry 相同
+
+    (group_id, name) 为主键，host 上有索引，重复地址检查和
+    "哪些群保存了该地址" 都是索引查询。首次打开时自动导入数据目录下的
+    {group_id}.json 文件(原文件保留)。
+    所有数据库操作在单独的单线程执行器中串行执行，不阻塞事件循环。
+    """
+
+    DB_NAME = "servers.db"
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.data_dir / self.DB_NAME
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mcgetter-sqlite")
+        self._conn: Optional[sqlite3.Connection] = None
+
+    async def _run(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._call, fn)
+
+    def _call(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        if self._conn is None:
+            self._conn = self._open()
+        with self._conn:
+            return fn(self._conn)
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._upgrade_schema(conn)
+            self._migrate_json(conn)
+        except BaseException:
+            # 初始化失败时关闭连接，下次调用会重新打开
+            conn.close()
+            raise
+        return conn
+
+    @staticmethod
+    def _upgrade_schema(conn: sqlite3.Connection) -> None:
+        """为旧版本创建的数据库补充玩家列表提供者字段"""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(servers)")}
+        with conn:
+            for column in ("provider", "provider_url"):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE servers ADD COLUMN {column} TEXT")
+
+    def _migrate_json(self, conn: sqlite3.Connection) -> None:
+        """把旧的 {group_id}.json 导入数据库，只执行一次"""
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+            return
+
+        migrated = 0
+        with conn:
+            for path in sorted(self.data_dir.glob("*.json")):
+                try:
+                    data = json.loads(path.read_text(encoding="utf-8") or "{}")
+                except (OSError, json.JSONDecodeError) as e:
+                    logger.error(f"迁移 {path} 失败: {e}")
+                    continue
+                if not isinstance(data, dict):
+                    logger.error(f"迁移 {path} 失败: 不是服务器列表")
+                    continue
+                for name, info in data.items():
+                    if not isinstance(info, dict) or not info.get('host'):
+                        logger.error(f"迁移 {path} 时跳过格式错误的条目: {name}")
+                        continue
+                    conn.execute(
+                        "INSERT OR IGNORE INTO servers (group_id, name, host, provider, provider_url) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (path.stem, info.get('name', name), info['host'],
+                         info.get('provider'), info.get('provider_url')))
+                    migrated += 1
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', '1')")
+        if migrated:
+            logger.info(f"已从JSON文件迁移 {migrated} 个服务器到 {self.db_path}")
+
+    @staticmethod
+    def _row_to_info(name: str, host: str, provider: Optional[str], provider_url: Optional[str]) -> Dict[str, str]:
+        info = {'name': name, 'host': host}
+        if provider:
+            info.update(provider=provider, provider_url=provider_url or "")
+        return info
+
+    @classmethod
+    def _rows_to_group(cls, rows) -> Dict[str, Dict[str, str]]:
+        return {row[0]: cls._row_to_info(*row) for row in rows}
+
+    async def get_group(self, group_id: str) -> Dict[str, Dict[str, str]]:
+        """获取群组的服务器列表，保持添加顺序"""
+        rows = await self._run(lambda conn: conn.execute(
+            "SELECT name, host, provider, provider_url FROM servers WHERE group_id = ? ORDER BY rowid",
+            (group_id,)).fetchall())
+        return self._rows_to_group(rows)
+
+    async def all_groups(self) -> Dict[str, Dict[str, Dict[str, str]]]:
+        """获取所有群组的服务器列表"""
+        rows = await self._run(lambda conn: conn.execute(
+            "SELECT group_id, name, host, provider, provider_url FROM servers "
+            "ORDER BY group_id, rowid").fetchall())
+        result: Dict[str, Dict[str, Dict[str, str]]] = {}
+        for group_id, name, *fields in rows:
+            result.setdefault(group_id, {})[name] = self._row_to_info(name, *fields)
+        return result
+
+    async def groups_for_host(self, host: str) -> List[str]:
+        """返回保存了该地址的所有群组ID"""
+        rows = await self._run(lambda conn: conn.execute(
+            "SELECT DISTINCT group_id FROM servers WHERE host = ?", (host,)).fetchall())
+        return [row[0] for row in rows]
+
+    async def find_host(self, group_id: str, host: str) -> Optional[str]:
+        """查找群组中使用该地址的服务器名称"""
+        row = await self._run(lambda conn: conn.execute(
+            "SELECT name FROM servers WHERE host = ? AND group_id = ? LIMIT 1",
+            (host, group_id)).fetchone())
+        return row[0] if row else None
+
+    async def add(self, group_id: str, name: str, host: str) -> bool:
+        """添加服务器，名称或地址已存在时不添加"""
+        def insert(conn: sqlite3.Connection) -> bool:
+            if conn.execute("SELECT 1 FROM servers WHERE host = ? AND group_id = ?",
+                            (host, group_id)).fetchone():
+                return False
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO servers (group_id, name, host) VALUES (?, ?, ?)",
+                (group_id, name, host))
+            return cursor.rowcount == 1
+
+        if await self._run(insert):
+            logger.info(f"成功添加服务器数据: {name}")
+            return True
+        logger.warning(f"服务器名称或地址已存在: {name} -> {host}")
+        return False
+
+    async def add_many(self, group_id: str, servers: List[Dict[str, str]]) -> List[bool]:
+        """批量添加服务器，在同一个事务中提交；返回与 servers 顺序对应的是否添加成功"""
+        def insert_all(conn: sqlite3.Connection) -> List[bool]:
+            results = []
+            for server in servers:
+                if conn.execute("SELECT 1 FROM servers WHERE host = ? AND group_id = ?",
+                                (server['host'], group_id)).fetchone():
+                    results.append(False)
+                    continue
+                provider = server.get('provider') or None
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO servers (group_id, name, host, provider, provider_url) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (group_id, server['name'], server['host'], provider,
+                     (server.get('provider_url') or None) if provider else None))
+                results.append(cursor.rowcount == 1)
+            return results
+
+        results = await self._run(insert_all)
+        if any(results):
+            logger.info(f"批量添加了 {sum(results)} 个服务器")
+        return results
+
+    async def delete(self, group_id: str, name: str) -> bool:
+        """删除服务器"""
+        rowcount = await self._run(lambda conn: conn.execute(
+            "DELETE FROM servers WHERE group_id = ? AND name = ?",
+            (group_id, name)).rowcount)
+        if rowcount:
+            logger.info(f"成功删除服务器数据: {name}")
+            return True
+        logger.warning(f"服务器名称不存在: {name}")
+        return False
+
+    async def set_provider(self, group_id: str, name: str, provider: str = "", url: str = "") -> bool:
+        """设置服务器的玩家列表提供者(网页地图)，provider 为空时清除"""
+        rowcount = await self._run(lambda conn: conn.execute(
+            "UPDATE servers SET provider = ?, provider_url = ? WHERE group_id = ? AND name = ?",
+            (provider or None, (url or None) if provider else None, group_id, name)).rowcount)
+        if not rowcount:
+            logger.warning(f"服务器名称不存在: {name}")
+        return bool(rowcount)
+
+    async def flush(self) -> None:
+        """每次修改都已提交，无需额外写回"""
+
+    async def close(self) -> None:
+        """关闭数据库连接(单线程执行器保证之前提交的操作已完成)"""
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            await asyncio.get_running_loop().run_in_executor(self._executor, conn.close)
+        self._executor.shutdown(wait=False)
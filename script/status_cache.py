@@ -0,0 +1,139 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from astrbot.api import logger
+
+
+class StatusCache:
+    """
+    进程级服务器状态缓存
+
+    - 以主机地址为键，结果在 TTL 内直接复用
+    - 超过容量时按 LRU 淘汰
+    - 同一主机的并发请求共享同一次查询(single-flight)
+    """
+
+    def __init__(self, ttl: float = 15.0, max_size: int = 512):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def configure(self, ttl: Optional[float] = None, max_size: Optional[int] = None) -> None:
+        """
+        更新缓存参数
+
+        Args:
+            ttl: 缓存有效期(秒)，为0时禁用缓存但仍合并并发请求
+            max_size: 最多缓存的主机数量
+        """
+        if ttl is not None:
+            self.ttl = max(0.0, float(ttl))
+        if max_size is not None:
+            self.max_size = max(1, int(max_size))
+        self._evict()
+
+    @staticmethod
+    def _key(host: str) -> str:
+        return host.strip().lower()
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def peek(self, host: str) -> Optional[Dict[str, Any]]:
+        """
+        获取未过期的缓存结果，不触发查询
+
+        Args:
+            host: 服务器地址
+
+        Returns:
+            缓存结果的副本，未命中时返回None
+        """
+        key = self._key(host)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return dict(result)
+
+    def put(self, host: str, result: Dict[str, Any]) -> None:
+        """写入一条查询结果"""
+        if self.ttl <= 0:
+            return
+        key = self._key(host)
+        self._entries[key] = (time.monotonic(), result)
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def invalidate(self, host: str) -> None:
+        """删除指定主机的缓存"""
+        self._entries.pop(self._key(host), None)
+
+    async def get(
+        self,
+        host: str,
+        loader: Callable[[str], Awaitable[Optional[Dict[str, Any]]]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        获取主机状态，未命中时调用 loader 查询
+
+        Args:
+            host: 服务器地址
+            loader: 实际执行查询的协程函数
+
+        Returns:
+            状态字典的副本，查询失败时返回None
+        """
+        cached = self.peek(host)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        key = self._key(host)
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(loader(host))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._on_done(k, t))
+        else:
+            self.coalesced += 1
+            logger.debug(f"合并对 {host} 的并发状态查询")
+
+        # shield: 单个调用方超时取消时不影响其他等待同一查询的调用方
+        result = await asyncio.shield(task)
+        return dict(result) if result is not None else None
+
+    def _on_done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        result = task.result()
+        if result is not None:
+            self.put(key, result)
+
+    def stats(self) -> Dict[str, int]:
+        """返回缓存统计信息"""
+        return {
+            "size": len(self._entries),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
+
+
+# 进程级共享实例
+status_cache = StatusCache()
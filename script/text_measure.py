@@ -0,0 +1,103 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Tuple
+
+ELLIPSIS = "..."
+
+
+def _font_key(font) -> Hashable:
+    """字体的缓存键，TrueType 字体按 (路径, 字号)，其他字体按对象本身"""
+    path = getattr(font, "path", None)
+    if path is None:
+        return id(font)
+    return (str(path), getattr(font, "size", None))
+
+
+class TextMeasurer:
+    """
+    文本宽度和截断结果缓存
+
+    玩家名、版本号等文本在多次渲染之间大量重复，
+    以 (字体, 文本) 为键缓存测量结果，超出容量时按 LRU 淘汰。
+    """
+
+    def __init__(self, max_entries: int = 16384):
+        self.max_entries = max_entries
+        self._widths: "OrderedDict[Tuple[Hashable, str], float]" = OrderedDict()
+        self._truncated: "OrderedDict[Tuple[Hashable, str, float], str]" = OrderedDict()
+        # 渲染在线程池中并发执行
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, cache: OrderedDict, key) -> Any:
+        with self._lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return value
+
+    def _put(self, cache: OrderedDict, key, value) -> None:
+        with self._lock:
+            cache[key] = value
+            while len(cache) > self.max_entries:
+                cache.popitem(last=False)
+
+    def width(self, font, text: str) -> float:
+        """获取文本渲染宽度"""
+        key = (_font_key(font), text)
+        value = self._get(self._widths, key)
+        if value is None:
+            value = font.getlength(text)
+            self._put(self._widths, key, value)
+        return value
+
+    def truncate(self, font, text: str, max_width: float) -> str:
+        """
+        超出宽度时截断文本并添加省略号
+
+        对前缀长度二分查找，只需 O(log n) 次测量
+
+        Args:
+            font: 字体
+            text: 原始文本
+            max_width: 最大宽度(像素)
+
+        Returns:
+            不超过最大宽度的文本
+        """
+        if self.width(font, text) <= max_width:
+            return text
+
+        key = (_font_key(font), text, max_width)
+        value = self._get(self._truncated, key)
+        if value is not None:
+            return value
+
+        # 找到满足 宽度(text[:n] + "...") <= max_width 的最大 n
+        low, high = 0, len(text) - 1
+        while low < high:
+            mid = (low + high + 1) // 2
+            if font.getlength(text[:mid] + ELLIPSIS) <= max_width:
+                low = mid
+            else:
+                high = mid - 1
+        value = text[:low] + ELLIPSIS
+        self._put(self._truncated, key, value)
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        """返回缓存统计信息"""
+        return {
+            "widths": len(self._widths),
+            "truncated": len(self._truncated),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# 进程级共享实例
+text_measurer = TextMeasurer()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# 插件目录下的 script 包使用相对导入，测试以 script.* 的形式导入
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,63 @@
+import asyncio
+import time
+
+import pytest
+
+from script.circuit_breaker import circuit_breaker
+from script.fake_server import FakeServerConfig, FakeServerFarm
+from script.get_server_info import configure_status_client, get_server_status
+from script.history import history_store
+from script.slp import slp_client
+
+
+@pytest.fixture(autouse=True)
+def isolated_state():
+    configure_status_client("native")
+    slp_client.configure(timeout=1.0)
+    circuit_breaker.configure(failure_threshold=2)
+    history_store.configure(enabled=False)
+    yield
+    circuit_breaker._states.clear()
+
+
+def _fetch_all(configs):
+    async def run():
+        async with FakeServerFarm(configs) as farm:
+            start = time.perf_counter()
+            results = await asyncio.gather(*[get_server_status(address, use_cache=False)
+                                             for address in farm.addresses])
+            return farm.addresses, results, time.perf_counter() - start
+    return asyncio.run(run())
+
+
+def test_query_gives_full_player_list():
+    _, (info,), _ = _fetch_all([FakeServerConfig(players=30, max_players=50)])
+    assert info["plays_online"] == 30 and info["plays_max"] == 50
+    # status 只返回12个玩家样本，完整列表来自 query
+    assert info["players_list"] == sorted(f"Player_{i:03d}" for i in range(30))
+    assert info["icon_base64"]
+
+
+def test_query_disabled_falls_back_to_sample_quickly():
+    _, (info,), elapsed = _fetch_all([FakeServerConfig(players=30, query=False, latency_ms=5)])
+    assert len(info["players_list"]) == 12
+    # 未开启query的服务器不应等待 mcstatus 默认的3秒
+    assert elapsed < 1.5
+
+
+def test_failures_open_the_breaker():
+    async def run():
+        async with FakeServerFarm([FakeServerConfig(failure="timeout")]) as farm:
+            host = farm.addresses[0]
+            for _ in range(2):
+                assert await get_server_status(host, use_cache=False) is None
+            # 连续失败两次后熔断，之后不再连接，直接返回离线
+            connections = farm.servers[0].connections
+            start = time.perf_counter()
+            assert await get_server_status(host, use_cache=False) is None
+            return host, farm.servers[0].connections - connections, time.perf_counter() - start
+
+    host, new_connections, elapsed = asyncio.run(run())
+    assert new_connections == 0 and elapsed < 0.1
+    entry = circuit_breaker.offline_info(host)
+    assert entry is not None and entry.error_kind == "timeout"
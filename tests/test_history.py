@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+from script.history import OFFLINE_LATENCY, HistoryStore, HostHistory, RingSeries
+
+
+def _minute(offset: int = 0) -> int:
+    now = int(time.time())
+    return now - now % 60 - 3600 + offset
+
+
+def test_ring_series_wraps_in_order():
+    series = RingSeries(3)
+    for i in range(5):
+        series.append(i * 60, i, 10 + i)
+    assert series.points() == [(120, 2, 12), (180, 3, 13), (240, 4, 14)]
+    assert series.points(since=180) == [(180, 3, 13), (240, 4, 14)]
+
+
+def test_minute_buckets_roll_up():
+    history = HostHistory("example.com", (120, 48))
+    start = _minute()
+    history.record(start + 5, 3, 20)
+    history.record(start + 30, 5, 40)
+    history.record(start + 65, 0, None)  # 下一分钟离线，前一个时间桶结束
+    assert history.points(0, 0) == [(start, 5, 30), (start + 60, 0, OFFLINE_LATENCY)]
+
+
+def test_host_history_binary_round_trip():
+    history = HostHistory("mc.example.com:25566", (5, 4))
+    start = _minute()
+    for i in range(8):
+        history.record(start + i * 60, i, None if i % 3 == 0 else 15 * i)
+    data = history.to_bytes()
+    restored = HostHistory.from_bytes(data, (5, 4))
+    assert restored.host == history.host
+    for tier in range(2):
+        assert restored.points(tier, 0) == history.points(tier, 0)
+    assert restored.to_bytes() == data
+
+
+def test_store_save_and_load(tmp_path):
+    start = _minute()
+
+    async def write():
+        store = HistoryStore()
+        store.configure(data_dir=tmp_path, enabled=True)
+        store.record("Example.com", {"plays_online": 4, "latency": 33}, start)
+        store.record("offline.example.com", None, start)
+        await store.close()
+
+    async def read():
+        store = HistoryStore()
+        store.configure(data_dir=tmp_path, enabled=True)
+        await store.start()
+        try:
+            return store.query("example.com", 7200)[1], store.query("offline.example.com", 7200)[1]
+        finally:
+            await store.close()
+
+    asyncio.run(write())
+    assert len(list(tmp_path.glob("*.bin"))) == 2
+    online, offline = asyncio.run(read())
+    assert online == [(start, 4, 33)]
+    assert offline == [(start, 0, OFFLINE_LATENCY)]
+
+
+def test_record_offline_once_per_bucket():
+    store = HistoryStore()
+    store.configure(enabled=True)
+    start = _minute()
+    for second in range(0, 300, 10):
+        store.record_offline("down.example.com", start + second)
+    assert store.query("down.example.com", 7200)[1] == [
+        (start + minute * 60, 0, OFFLINE_LATENCY) for minute in range(5)]
+
+    # 已有在线采样的时间桶不会被熔断期间的离线记录覆盖
+    store.record("up.example.com", {"plays_online": 2, "latency": 10}, start)
+    store.record_offline("up.example.com", start + 30)
+    assert store.query("up.example.com", 7200)[1] == [(start, 2, 10)]
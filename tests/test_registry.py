@@ -0,0 +1,156 @@
+import asyncio
+import json
+
+import pytest
+
+import script.registry as registry_module
+from script.registry import ServerRegistry
+from script.sqlite_registry import SQLiteRegistry
+
+
+def _read(path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def make_registry(request, tmp_path):
+    def make():
+        if request.param == "sqlite":
+            return SQLiteRegistry(tmp_path)
+        return ServerRegistry(tmp_path, flush_delay=0.01)
+    return make
+
+
+def test_concurrent_adds_keep_one_per_host(make_registry):
+    async def run():
+        registry = make_registry()
+        results = await asyncio.gather(*[registry.add("g", f"s{i}", "mc.example.com") for i in range(10)])
+        group = await registry.get_group("g")
+        await registry.close()
+        return results, group
+
+    results, group = asyncio.run(run())
+    assert results.count(True) == 1
+    assert [info['host'] for info in group.values()] == ["mc.example.com"]
+
+
+def test_add_many_reports_each_entry(make_registry):
+    async def run():
+        registry = make_registry()
+        await registry.add("g", "a", "h1")
+        results = await registry.add_many("g", [
+            {'name': 'b', 'host': 'h2', 'provider': 'dynmap', 'provider_url': 'https://m/up'},
+            {'name': 'a', 'host': 'h3'},  # 名称已存在
+            {'name': 'c', 'host': 'h1'},  # 地址已存在
+            {'name': 'd', 'host': 'h2'},  # 与前面的条目地址重复
+            {'name': 'e', 'host': 'h4'},
+        ])
+        group = await registry.get_group("g")
+        await registry.close()
+        return results, group
+
+    results, group = asyncio.run(run())
+    assert results == [True, False, False, False, True]
+    assert list(group) == ['a', 'b', 'e']
+    assert group['b'] == {'name': 'b', 'host': 'h2', 'provider': 'dynmap', 'provider_url': 'https://m/up'}
+
+
+def test_changes_survive_reopen(make_registry):
+    async def write():
+        registry = make_registry()
+        await registry.add("g", "a", "h1")
+        await registry.add("g", "b", "h2")
+        await registry.delete("g", "a")
+        await registry.set_provider("g", "b", "squaremap", "https://m/tiles/players.json")
+        await registry.close()
+
+    async def read():
+        registry = make_registry()
+        try:
+            return await registry.get_group("g")
+        finally:
+            await registry.close()
+
+    asyncio.run(write())
+    assert asyncio.run(read()) == {
+        'b': {'name': 'b', 'host': 'h2', 'provider': 'squaremap', 'provider_url': 'https://m/tiles/players.json'}}
+
+
+def test_json_writes_are_coalesced(tmp_path, monkeypatch):
+    writes = []
+    original = registry_module.write_json
+
+    async def counting_write(path, data):
+        writes.append(dict(data))
+        await original(path, data)
+
+    monkeypatch.setattr(registry_module, "write_json", counting_write)
+
+    async def run():
+        registry = ServerRegistry(tmp_path, flush_delay=0.05)
+        await registry.get_group("g")  # 文件不存在时 read_json 会创建空文件
+        writes.clear()
+        for i in range(5):
+            await registry.add("g", f"s{i}", f"h{i}")
+        await asyncio.sleep(0.2)
+        await registry.close()
+
+    asyncio.run(run())
+    assert len(writes) == 1 and len(writes[0]) == 5
+    assert len(_read(tmp_path / "g.json")) == 5
+
+
+def test_close_during_flush_keeps_change(tmp_path, monkeypatch):
+    original = registry_module.write_json
+
+    async def slow_write(path, data):
+        await asyncio.sleep(0.2)
+        await original(path, data)
+
+    monkeypatch.setattr(registry_module, "write_json", slow_write)
+
+    async def run():
+        registry = ServerRegistry(tmp_path, flush_delay=0.01)
+        await registry.add("g", "a", "h1")
+        await asyncio.sleep(0.1)  # 延迟写回正在进行
+        await registry.close()
+
+    asyncio.run(run())
+    assert _read(tmp_path / "g.json") == {'a': {'name': 'a', 'host': 'h1'}}
+
+
+def test_json_reloads_external_edits(tmp_path):
+    async def run():
+        registry = ServerRegistry(tmp_path, flush_delay=0.01)
+        await registry.add("g", "a", "h1")
+        await registry.flush()
+        await asyncio.sleep(0.02)
+        path = tmp_path / "g.json"
+        path.write_text(json.dumps({'x': {'name': 'x', 'host': 'hx'}}), encoding="utf-8")
+        try:
+            return await registry.get_group("g")
+        finally:
+            await registry.close()
+
+    assert asyncio.run(run()) == {'x': {'name': 'x', 'host': 'hx'}}
+
+
+def test_sqlite_migration_skips_malformed_entries(tmp_path):
+    (tmp_path / "g.json").write_text(json.dumps({
+        "a": {"name": "a", "host": "h1", "provider": "dynmap", "provider_url": "https://m/up"},
+        "b": {"name": "b"},
+        "c": "oops",
+    }), encoding="utf-8")
+    (tmp_path / "bad.json").write_text("[1, 2]", encoding="utf-8")
+    (tmp_path / "broken.json").write_text("{oops", encoding="utf-8")
+
+    async def run():
+        registry = SQLiteRegistry(tmp_path)
+        try:
+            return await registry.all_groups(), await registry.groups_for_host("h1")
+        finally:
+            await registry.close()
+
+    groups, host_groups = asyncio.run(run())
+    assert groups == {'g': {'a': {'name': 'a', 'host': 'h1', 'provider': 'dynmap', 'provider_url': 'https://m/up'}}}
+    assert host_groups == ['g']
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from script.server_list import dump_server_list, parse_server_list
+
+
+def test_parse_lines():
+    text = "\n  生存服 mc.example.com:25566\n\nplay.example.org\n"
+    assert parse_server_list(text) == [
+        {'name': '生存服', 'host': 'mc.example.com:25566'},
+        {'name': 'play.example.org', 'host': 'play.example.org'},
+    ]
+
+
+def test_parse_line_with_too_many_fields():
+    with pytest.raises(ValueError):
+        parse_server_list("a b c")
+
+
+def test_parse_json_list():
+    text = json.dumps([
+        {"name": "A", "host": "a.example.com", "provider": "BlueMap", "provider_url": "https://m/players.json"},
+        {"host": "b.example.com"},
+        "c.example.com",
+    ])
+    assert parse_server_list(text) == [
+        {'name': 'A', 'host': 'a.example.com', 'provider': 'bluemap', 'provider_url': 'https://m/players.json'},
+        {'name': 'b.example.com', 'host': 'b.example.com'},
+        {'name': 'c.example.com', 'host': 'c.example.com'},
+    ]
+
+
+def test_parse_json_object():
+    text = json.dumps({"A": {"host": "a.example.com"}, "B": "b.example.com"})
+    assert parse_server_list(text) == [
+        {'name': 'A', 'host': 'a.example.com'},
+        {'name': 'B', 'host': 'b.example.com'},
+    ]
+
+
+@pytest.mark.parametrize("text", ["[1, 2]", '[{"name": "A"}]', "[{oops", '[""]'])
+def test_parse_json_errors(text):
+    with pytest.raises(ValueError):
+        parse_server_list(text)
+
+
+def test_export_round_trip():
+    group = {
+        'A': {'name': 'A', 'host': 'a.example.com'},
+        'B': {'name': 'B', 'host': 'b.example.com', 'provider': 'dynmap', 'provider_url': 'https://m/up'},
+    }
+    assert parse_server_list(dump_server_list(group)) == list(group.values())
@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import pytest
+
+from script.fake_server import FakeServerConfig, FakeServerFarm
+from script.slp import (SLPClient, SLPError, _packet, _read_varint, build_handshake, decode_varint,
+                        encode_varint, parse_status_payload)
+
+
+@pytest.mark.parametrize("value", [0, 1, 127, 128, 255, 25565, 2 ** 31 - 1, -1, -(2 ** 31)])
+def test_varint_round_trip(value):
+    data = encode_varint(value)
+    assert len(data) <= 5
+    assert decode_varint(memoryview(data), 0) == (value, len(data))
+
+
+def test_varint_errors():
+    with pytest.raises(SLPError):
+        decode_varint(memoryview(b"\x80\x80"), 0)
+    with pytest.raises(SLPError):
+        decode_varint(memoryview(b"\xff" * 6), 0)
+
+
+def test_handshake_framing():
+    data = memoryview(build_handshake("mc.example.com", 25565))
+    length, offset = decode_varint(data, 0)
+    packet = data[offset:offset + length]
+    packet_id, pos = decode_varint(packet, 0)
+    assert packet_id == 0x00
+    _, pos = decode_varint(packet, pos)  # 协议版本
+    host_length, pos = decode_varint(packet, pos)
+    assert bytes(packet[pos:pos + host_length]) == b"mc.example.com"
+    pos += host_length
+    assert int.from_bytes(packet[pos:pos + 2], "big") == 25565
+    assert decode_varint(packet, pos + 2)[0] == 1  # 下一状态: status
+    # 状态请求包紧跟在握手包之后
+    assert bytes(data[offset + length:]) == _packet(0x00)
+
+
+def test_parse_status_payload():
+    body = b'{"players": {"online": 1, "max": 2}}'
+    assert parse_status_payload(memoryview(encode_varint(len(body)) + body))["players"]["online"] == 1
+    with pytest.raises(SLPError):
+        parse_status_payload(memoryview(encode_varint(100) + body))
+    with pytest.raises(SLPError):
+        parse_status_payload(memoryview(encode_varint(5) + b"{oops"))
+    with pytest.raises(SLPError):
+        parse_status_payload(memoryview(encode_varint(2) + b"[]"))
+
+
+def test_status_against_fake_servers():
+    configs = [
+        FakeServerConfig(players=3, max_players=10, version="Paper 1.21"),
+        FakeServerConfig(failure="garbage"),
+        FakeServerConfig(failure="refuse"),
+        FakeServerConfig(failure="timeout"),
+    ]
+
+    async def run():
+        client = SLPClient(timeout=1.0)
+        async with FakeServerFarm(configs) as farm:
+            results = []
+            for server in farm.servers:
+                try:
+                    results.append(await client.status(server.host, server.port))
+                except BaseException as e:
+                    results.append(e)
+            return results, client.stats()
+
+    (ok, garbage, refused, timed_out), stats = asyncio.run(run())
+    assert ok.players_online == 3 and ok.players_max == 10
+    assert ok.version_name == "Paper 1.21"
+    assert ok.sample == [f"Player_{i:03d}" for i in range(3)]
+    assert ok.icon.startswith("data:image/png;base64,")
+    assert isinstance(garbage, SLPError)
+    # 接受连接后立即关闭，取决于时机可能是提前关闭或连接重置
+    assert isinstance(refused, (SLPError, ConnectionError))
+    assert isinstance(timed_out, asyncio.TimeoutError)
+    assert stats["connections"] == 4 and stats["failures"] == 3
+
+
+def test_status_without_pong_keeps_status():
+    """响应状态但不响应ping的服务器：使用状态请求的往返时间，不整体超时"""
+    async def handle(reader, writer):
+        for _ in range(2):
+            await reader.readexactly(await _read_varint(reader))
+        body = FakeServerConfig(players=7).status_json()
+        writer.write(_packet(0x00, encode_varint(len(body)) + body))
+        await writer.drain()
+        await reader.read()
+        writer.close()
+
+    async def run():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await SLPClient().status("127.0.0.1", port, timeout=2.0)
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    start = time.perf_counter()
+    status = asyncio.run(run())
+    assert time.perf_counter() - start < 1.9
+    assert status.players_online == 7
+    assert status.latency >= 0